@@ -34,6 +34,7 @@ import urllib3
 import serial
 import serial.tools.list_ports
 import zmq
+from collections import deque
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 from typing import Optional, List, Dict, Any
@@ -56,7 +57,10 @@ logger = logging.getLogger("mesh-mapper-headless")
 
 # Initialize global variables
 tracked_pairs = {}
-detection_history = []
+# Bounded so long-running sessions don't grow without limit (the CSV keeps the
+# full log); resized from --history-size in main().
+DEFAULT_HISTORY_SIZE = 10000
+detection_history = deque(maxlen=DEFAULT_HISTORY_SIZE)
 
 # Serial connection tracking
 zmq_contexts = {}
@@ -872,6 +876,7 @@ def main():
     parser.add_argument('--stale-threshold', type=int, default=1, help='Minutes after which a detection is considered stale (default: 1)')
     parser.add_argument('--status-interval', type=int, default=60, help='Interval in seconds between status updates (default: 60)')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], default='INFO', help='Log level (default: INFO)')
+    parser.add_argument('--history-size', type=int, default=DEFAULT_HISTORY_SIZE, help=f'Number of recent detections kept in memory (default: {DEFAULT_HISTORY_SIZE})')
     
     # Parse arguments
     args = parser.parse_args()
@@ -883,6 +888,11 @@ def main():
     global BAUD_RATE
     if args.baud_rate:
         BAUD_RATE = args.baud_rate
+
+    if args.history_size < 1:
+        parser.error("--history-size must be at least 1")
+    global detection_history
+    detection_history = deque(maxlen=args.history_size)
         
     # Check if at least one input method is provided
     if not args.serial_ports and not args.zmq_endpoints:
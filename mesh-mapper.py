@@ -8,12 +8,31 @@ import serial.tools.list_ports
 import time
 import csv
 import os
+import atexit
+import queue
+import gzip
+import hashlib
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
-from flask import Flask, request, jsonify, redirect, url_for, render_template_string, send_file
+from flask import Flask, Response, request, jsonify, redirect, url_for, send_file
+from markupsafe import Markup, escape
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import zmq
 from zmq.error import ZMQError
+# orjson is optional; without it (or on Flask < 2.2, which has no JSON
+# provider hook) responses are encoded with the stdlib json module.
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    orjson = None
+# brotli is optional too; cached pages are offered as br when it is installed.
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Ensure file paths are absolute
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -22,11 +41,43 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 app = Flask(__name__)
 
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """jsonify()/request.get_json() through orjson; unknown types fall back to Flask's default()."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+
+def dumps_json(obj):
+    """Serialize obj to a JSON string, with orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
 # ----------------------
 # Global Variables & Files
 # ----------------------
 tracked_pairs = {}
-detection_history = []  # For CSV logging and KML generation
+# Guards tracked_pairs: it is written by serial threads and read by Flask
+# request threads and the KML writer.
+tracked_pairs_lock = threading.RLock()
+# Recent detections backing /api/paths and /api/detections_history; bounded so
+# long-running sessions don't grow without limit (the CSV keeps the full log).
+DETECTION_HISTORY_MAXLEN = 10000
+detection_history = deque(maxlen=DETECTION_HISTORY_MAXLEN)
+# Serialized /api/paths response; update_detection marks it dirty when the
+# history grows and the next request rebuilds it.
+paths_dirty = True
+paths_page = None
+paths_cache_lock = threading.Lock()
+# Open /api/paths/stream connections, each fed path deltas through its own queue
+path_subscribers = set()
+path_subscribers_lock = threading.Lock()
 
 # Changed: Instead of one selected port, we allow up to three.
 SELECTED_PORTS = {}  # key will be 'port1', 'port2', 'port3'
@@ -40,6 +91,8 @@ last_mac_by_port = {}
 # Track open serial objects for cleanup
 serial_objs = {}
 serial_objs_lock = threading.Lock()
+# Reader thread per port, so a port already being read is never started twice
+serial_threads = {}
 
 startup_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 # Updated detections CSV header to include faa_data.
@@ -47,37 +100,54 @@ CSV_FILENAME = os.path.join(BASE_DIR, f"detections_{startup_timestamp}.csv")
 KML_FILENAME = os.path.join(BASE_DIR, f"detections_{startup_timestamp}.kml")
 FAA_LOG_FILENAME = os.path.join(BASE_DIR, "faa_log.csv")  # FAA log CSV remains basic
 
-# Write CSV header for detections.
-with open(CSV_FILENAME, mode='w', newline='') as csvfile:
-    fieldnames = [
-        'timestamp', 'mac', 'rssi', 'drone_lat', 'drone_long',
-        'drone_altitude', 'pilot_lat', 'pilot_long', 'basic_id', 'faa_data'
-    ]
-    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-    writer.writeheader()
-
-# Create FAA log CSV with header if not exists.
-if not os.path.exists(FAA_LOG_FILENAME):
-    with open(FAA_LOG_FILENAME, mode='w', newline='') as csvfile:
-        fieldnames = ['timestamp', 'mac', 'remote_id', 'faa_response']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+# Write CSV header for detections. The file stays open for the lifetime of the
+# process so each detection is a single buffered write instead of open/close.
+csv_file = open(CSV_FILENAME, mode='w', newline='', buffering=1 << 16)
+csv_writer = csv.DictWriter(csv_file, fieldnames=[
+    'timestamp', 'mac', 'rssi', 'drone_lat', 'drone_long',
+    'drone_altitude', 'pilot_lat', 'pilot_long', 'basic_id', 'faa_data'
+])
+csv_writer.writeheader()
+csv_file.flush()
+csv_lock = threading.Lock()
+atexit.register(csv_file.close)
+
+# Create FAA log CSV with header if not exists, and keep it open for appends.
+faa_log_exists = os.path.exists(FAA_LOG_FILENAME)
+faa_log_file = open(FAA_LOG_FILENAME, mode='a', newline='')
+faa_log_writer = csv.DictWriter(faa_log_file, fieldnames=['timestamp', 'mac', 'remote_id', 'faa_response'])
+if not faa_log_exists:
+    faa_log_writer.writeheader()
+    faa_log_file.flush()
+faa_log_lock = threading.Lock()
+atexit.register(faa_log_file.close)
 
 # --- Alias Persistence ---
 ALIASES_FILE = os.path.join(BASE_DIR, "aliases.json")
 ALIASES = {}
+# Last serialized ALIASES known to be on disk, so no-op saves skip the write.
+saved_aliases_json = None
 if os.path.exists(ALIASES_FILE):
     try:
         with open(ALIASES_FILE, "r") as f:
             ALIASES = json.load(f)
+        saved_aliases_json = json.dumps(ALIASES)
     except Exception as e:
         print("Error loading aliases:", e)
 
 def save_aliases():
-    global ALIASES
+    global saved_aliases_json
     try:
-        with open(ALIASES_FILE, "w") as f:
-            json.dump(ALIASES, f)
+        data = json.dumps(ALIASES)
+        if data == saved_aliases_json and os.path.exists(ALIASES_FILE):
+            return
+        # Serialize first and write in one call, then rename so a crash
+        # mid-write never leaves a truncated aliases file behind.
+        tmp_path = ALIASES_FILE + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, ALIASES_FILE)
+        saved_aliases_json = data
     except Exception as e:
         print("Error saving aliases:", e)
 
@@ -86,6 +156,9 @@ def save_aliases():
 # ----------------------
 FAA_CACHE_FILE = os.path.join(BASE_DIR, "faa_cache.csv")
 FAA_CACHE = {}
+# Latest FAA data per mac, so detections without a cached (mac, basic_id) pair
+# find a fallback without scanning FAA_CACHE.
+FAA_BY_MAC = {}
 
 # Load FAA cache from file
 if os.path.exists(FAA_CACHE_FILE):
@@ -95,30 +168,57 @@ if os.path.exists(FAA_CACHE_FILE):
             for row in reader:
                 key = (row['mac'], row['remote_id'])
                 FAA_CACHE[key] = json.loads(row['faa_response'])
+                FAA_BY_MAC[row['mac']] = FAA_CACHE[key]
     except Exception as e:
         print("Error loading FAA cache:", e)
 
+# Keep the FAA cache file open for appends.
+faa_cache_exists = os.path.isfile(FAA_CACHE_FILE)
+faa_cache_file = open(FAA_CACHE_FILE, "a", newline='')
+faa_cache_writer = csv.DictWriter(faa_cache_file, fieldnames=["mac", "remote_id", "faa_response"])
+if not faa_cache_exists:
+    faa_cache_writer.writeheader()
+    faa_cache_file.flush()
+faa_cache_lock = threading.Lock()
+atexit.register(faa_cache_file.close)
+
 def write_to_faa_cache(mac, remote_id, faa_data):
     key = (mac, remote_id)
     FAA_CACHE[key] = faa_data
+    FAA_BY_MAC[mac] = faa_data
     try:
-        file_exists = os.path.isfile(FAA_CACHE_FILE)
-        with open(FAA_CACHE_FILE, "a", newline='') as csvfile:
-            fieldnames = ["mac", "remote_id", "faa_response"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow({
+        with faa_cache_lock:
+            faa_cache_writer.writerow({
                 "mac": mac,
                 "remote_id": remote_id,
                 "faa_response": json.dumps(faa_data)
             })
+            faa_cache_file.flush()
     except Exception as e:
         print("Error writing to FAA cache:", e)
 
 # ----------------------
 # KML Generation (including FAA data)
 # ----------------------
+# Placemark templates are built once; each detection is a single %-format
+# instead of several f-string interpolations and list appends.
+KML_DRONE_PLACEMARK = (
+    '<Placemark><name>Drone %s%s</name>\n'
+    '<Style><IconStyle><scale>1.2</scale>'
+    '<Icon><href>http://maps.google.com/mapfiles/kml/shapes/heliport.png</href></Icon>'
+    '</IconStyle></Style>\n'
+    '<Point><coordinates>%s,%s,0</coordinates></Point>\n'
+    '</Placemark>'
+)
+KML_PILOT_PLACEMARK = (
+    '<Placemark><name>Pilot %s%s</name>\n'
+    '<Style><IconStyle><scale>1.2</scale>'
+    '<Icon><href>http://maps.google.com/mapfiles/kml/shapes/man.png</href></Icon>'
+    '</IconStyle></Style>\n'
+    '<Point><coordinates>%s,%s,0</coordinates></Point>\n'
+    '</Placemark>'
+)
+
 def generate_kml():
     kml_lines = [
         '<?xml version="1.0" encoding="UTF-8"?>',
@@ -126,38 +226,73 @@ def generate_kml():
         '<Document>',
         f'<name>Detections {startup_timestamp}</name>'
     ]
-    for mac, det in tracked_pairs.items():
+    with tracked_pairs_lock:
+        snapshot = list(tracked_pairs.items())
+    for mac, det in snapshot:
         remoteIdStr = ""
         if det.get("basic_id"):
             remoteIdStr = " (RemoteID: " + det.get("basic_id") + ")"
         if det.get("faa_data"):
             remoteIdStr += " FAA: " + json.dumps(det.get("faa_data"))
         # Drone placemark
-        kml_lines.append(f'<Placemark><name>Drone {mac}{remoteIdStr}</name>')
-        kml_lines.append('<Style><IconStyle><scale>1.2</scale>'
-                         '<Icon><href>http://maps.google.com/mapfiles/kml/shapes/heliport.png</href></Icon>'
-                         '</IconStyle></Style>')
-        kml_lines.append(f'<Point><coordinates>{det.get("drone_long",0)},{det.get("drone_lat",0)},0</coordinates></Point>')
-        kml_lines.append('</Placemark>')
+        kml_lines.append(KML_DRONE_PLACEMARK % (mac, remoteIdStr, det.get("drone_long", 0), det.get("drone_lat", 0)))
         # Pilot placemark
-        kml_lines.append(f'<Placemark><name>Pilot {mac}{remoteIdStr}</name>')
-        kml_lines.append('<Style><IconStyle><scale>1.2</scale>'
-                         '<Icon><href>http://maps.google.com/mapfiles/kml/shapes/man.png</href></Icon>'
-                         '</IconStyle></Style>')
-        kml_lines.append(f'<Point><coordinates>{det.get("pilot_long",0)},{det.get("pilot_lat",0)},0</coordinates></Point>')
-        kml_lines.append('</Placemark>')
+        kml_lines.append(KML_PILOT_PLACEMARK % (mac, remoteIdStr, det.get("pilot_long", 0), det.get("pilot_lat", 0)))
     kml_lines.append('</Document></kml>')
-    with open(KML_FILENAME, "w") as f:
-        f.write("\n".join(kml_lines))
+    # Write to a temp file and rename so readers never see a half-written KML.
+    with kml_lock:
+        tmp_path = KML_FILENAME + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(kml_lines))
+        os.replace(tmp_path, KML_FILENAME)
     print("Updated KML file:", KML_FILENAME)
 
+kml_lock = threading.Lock()
+
 # Generate initial KML so the file exists from startup
 generate_kml()
 
+# Detections can arrive many times per second; rather than rewriting the KML on
+# each one, mark it dirty and let a background thread rewrite it at most once
+# per KML_WRITE_INTERVAL.
+KML_WRITE_INTERVAL = 1.0
+kml_dirty = False
+
+def kml_writer():
+    global kml_dirty
+    while True:
+        time.sleep(KML_WRITE_INTERVAL)
+        if kml_dirty:
+            kml_dirty = False
+            try:
+                generate_kml()
+            except Exception as e:
+                print("Error writing KML:", e)
+
+threading.Thread(target=kml_writer, daemon=True).start()
+
 # ----------------------
 # Detection Update & CSV Logging
 # ----------------------
+# Default marker colour per mac, computed once at first sight. The hash is the
+# map's JS string hash (int32 wrap-around included), so colours are unchanged.
+mac_colors = {}
+
+def to_int32(value):
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value & 0x80000000 else value
+
+def color_for_mac(mac):
+    color = mac_colors.get(mac)
+    if color is None:
+        h = 0
+        for ch in mac:
+            h = ord(ch) + (to_int32(to_int32(h) << 5) - h)
+        color = mac_colors[mac] = f"hsl({abs(h) % 360}, 70%, 50%)"
+    return color
+
 def update_detection(detection):
+    global kml_dirty, paths_dirty
     mac = detection.get("mac")
     if not mac:
         return
@@ -170,23 +305,24 @@ def update_detection(detection):
     # If the new detection has invalid (0) drone coordinates...
     if not valid_drone:
         # If there is an existing record with valid coordinates, update only non-coordinate fields.
-        if mac in tracked_pairs:
-            existing = tracked_pairs[mac]
-            if existing.get("drone_lat", 0) != 0 and existing.get("drone_long", 0) != 0:
-                # Update fields other than drone coordinates
-                for field in ['rssi', 'basic_id', 'drone_altitude']:
-                    if field in detection:
-                        existing[field] = detection[field]
-                # Update pilot coordinates only if they are valid (non zero)
-                new_pilot_lat = detection.get("pilot_lat", 0)
-                new_pilot_long = detection.get("pilot_long", 0)
-                if new_pilot_lat != 0:
-                    existing["pilot_lat"] = new_pilot_lat
-                if new_pilot_long != 0:
-                    existing["pilot_long"] = new_pilot_long
-                existing["last_update"] = time.time()
-                print(f"Ignored update for {mac} due to invalid drone coordinates, preserving previous valid coordinates.")
-                return
+        with tracked_pairs_lock:
+            if mac in tracked_pairs:
+                existing = tracked_pairs[mac]
+                if existing.get("drone_lat", 0) != 0 and existing.get("drone_long", 0) != 0:
+                    # Update fields other than drone coordinates
+                    for field in ['rssi', 'basic_id', 'drone_altitude']:
+                        if field in detection:
+                            existing[field] = detection[field]
+                    # Update pilot coordinates only if they are valid (non zero)
+                    new_pilot_lat = detection.get("pilot_lat", 0)
+                    new_pilot_long = detection.get("pilot_long", 0)
+                    if new_pilot_lat != 0:
+                        existing["pilot_lat"] = new_pilot_lat
+                    if new_pilot_long != 0:
+                        existing["pilot_long"] = new_pilot_long
+                    existing["last_update"] = time.time()
+                    print(f"Ignored update for {mac} due to invalid drone coordinates, preserving previous valid coordinates.")
+                    return
         # No previous valid record exists: ignore the detection entirely.
         print(f"Ignored detection for {mac} because drone coordinates are zero.")
         return
@@ -198,6 +334,7 @@ def update_detection(detection):
     detection["pilot_lat"] = detection.get("pilot_lat", 0)
     detection["pilot_long"] = detection.get("pilot_long", 0)
     detection["last_update"] = time.time()
+    detection["color"] = color_for_mac(mac)
 
     remote_id = detection.get("basic_id")
     # Try exact cache lookup by (mac, remote_id), then fallback to any cached data for this mac, then to previous tracked_pairs entry
@@ -208,24 +345,22 @@ def update_detection(detection):
             if key in FAA_CACHE:
                 detection["faa_data"] = FAA_CACHE[key]
         # Fallback: any cached FAA data for this mac
-        if "faa_data" not in detection:
-            for (c_mac, _), faa_data in FAA_CACHE.items():
-                if c_mac == mac:
-                    detection["faa_data"] = faa_data
-                    break
+        if "faa_data" not in detection and mac in FAA_BY_MAC:
+            detection["faa_data"] = FAA_BY_MAC[mac]
+
+    with tracked_pairs_lock:
         # Fallback: last known FAA data in tracked_pairs
         if "faa_data" not in detection and mac in tracked_pairs and "faa_data" in tracked_pairs[mac]:
             detection["faa_data"] = tracked_pairs[mac]["faa_data"]
-
-    tracked_pairs[mac] = detection
-    detection_history.append(detection.copy())
-    print("Updated tracked_pairs:", tracked_pairs)
-    with open(CSV_FILENAME, mode='a', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=[
-            'timestamp', 'mac', 'rssi', 'drone_lat', 'drone_long',
-            'drone_altitude', 'pilot_lat', 'pilot_long', 'basic_id', 'faa_data'
-        ])
-        writer.writerow({
+        tracked_pairs[mac] = detection
+        detection_history.append(detection.copy())
+        paths_dirty = True
+    publish_path_delta(detection)
+    # Dumping the whole dict on every detection is O(N); only log a summary when debugging.
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("tracked_pairs size=%d, last mac=%s", len(tracked_pairs), mac)
+    with csv_lock:
+        csv_writer.writerow({
             'timestamp': datetime.now().isoformat(),
             'mac': mac,
             'rssi': detection.get('rssi', ''),
@@ -237,7 +372,8 @@ def update_detection(detection):
             'basic_id': detection.get('basic_id', ''),
             'faa_data': json.dumps(detection.get('faa_data', {}))
         })
-    generate_kml()
+        csv_file.flush()
+    kml_dirty = True
 
 # ----------------------
 # Global Follow Lock & Color Overrides
@@ -248,6 +384,8 @@ colorOverrides = {}
 # ----------------------
 # FAA Query Helper Functions
 # ----------------------
+FAA_MAX_WORKERS = 8
+
 def create_retry_session(retries=3, backoff_factor=2, status_forcelist=(502, 503, 504)):
     logging.debug("Creating retry-enabled session with custom headers for FAA query.")
     session = requests.Session()
@@ -266,7 +404,7 @@ def create_retry_session(retries=3, backoff_factor=2, status_forcelist=(502, 503
         status_forcelist=status_forcelist,
         raise_on_status=False
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=FAA_MAX_WORKERS)
     session.mount("https://", adapter)
     return session
 
@@ -301,40 +439,62 @@ def query_remote_id(session, remote_id):
         logging.exception("Error querying FAA API: %s", e)
         return None
 
+# FAA lookups run on a small bounded pool so a burst of slow queries cannot tie
+# up every Flask worker thread.
+# Each pool worker keeps its own session: it holds TLS connections to the FAA
+# open between queries, and since requests.Session is not thread-safe no two
+# workers ever share a cookie jar while refreshing the cookie.
+faa_local = threading.local()
+
+def init_faa_worker():
+    faa_local.session = create_retry_session()
+
+FAA_EXECUTOR = ThreadPoolExecutor(max_workers=FAA_MAX_WORKERS, thread_name_prefix="faa",
+                                  initializer=init_faa_worker)
+FAA_QUERY_TIMEOUT = 90  # seconds; covers cookie refresh + query with retries
+
+def faa_lookup(remote_id):
+    session = faa_local.session
+    refresh_cookie(session)
+    return query_remote_id(session, remote_id)
+
 # ----------------------
 # New FAA Query API Endpoint
 # ----------------------
 @app.route('/api/query_faa', methods=['POST'])
 def api_query_faa():
+    global kml_dirty
     data = request.get_json()
     mac = data.get("mac")
     remote_id = data.get("remote_id")
     if not mac or not remote_id:
         return jsonify({"status": "error", "message": "Missing mac or remote_id"}), 400
-    session = create_retry_session()
-    refresh_cookie(session)
-    faa_result = query_remote_id(session, remote_id)
+    future = FAA_EXECUTOR.submit(faa_lookup, remote_id)
+    try:
+        faa_result = future.result(timeout=FAA_QUERY_TIMEOUT)
+    except FutureTimeoutError:
+        return jsonify({"status": "error", "message": "FAA query timed out"}), 504
     if faa_result is None:
         return jsonify({"status": "error", "message": "FAA query failed"}), 500
-    if mac in tracked_pairs:
-        tracked_pairs[mac]["faa_data"] = faa_result
-    else:
-        tracked_pairs[mac] = {"basic_id": remote_id, "faa_data": faa_result}
+    with tracked_pairs_lock:
+        if mac in tracked_pairs:
+            tracked_pairs[mac]["faa_data"] = faa_result
+        else:
+            tracked_pairs[mac] = {"basic_id": remote_id, "faa_data": faa_result}
     write_to_faa_cache(mac, remote_id, faa_result)
     timestamp = datetime.now().isoformat()
     try:
-        with open(FAA_LOG_FILENAME, "a", newline='') as csvfile:
-            fieldnames = ["timestamp", "mac", "remote_id", "faa_response"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writerow({
+        with faa_log_lock:
+            faa_log_writer.writerow({
                 "timestamp": timestamp,
                 "mac": mac,
                 "remote_id": remote_id,
                 "faa_response": json.dumps(faa_result)
             })
+            faa_log_file.flush()
     except Exception as e:
         print("Error writing to FAA log CSV:", e)
-    generate_kml()
+    kml_dirty = True
     return jsonify({"status": "ok", "faa_data": faa_result})
 
 # ----------------------
@@ -410,65 +570,68 @@ PORT_SELECTION_PAGE = '''
   <form method="POST" action="/select_ports">
     <label>Port 1:</label><br>
     <select id="port1" name="port1">
-      <option value="">--None--</option>
-      {% for port in ports %}
-        <option value="{{ port.device }}">{{ port.device }} - {{ port.description }}</option>
-      {% endfor %}
+      {{ options_html }}
     </select><br>
     <label>Port 2:</label><br>
     <select id="port2" name="port2">
-      <option value="">--None--</option>
-      {% for port in ports %}
-        <option value="{{ port.device }}">{{ port.device }} - {{ port.description }}</option>
-      {% endfor %}
+      {{ options_html }}
     </select><br>
     <label>Port 3:</label><br>
     <select id="port3" name="port3">
-      <option value="">--None--</option>
-      {% for port in ports %}
-        <option value="{{ port.device }}">{{ port.device }} - {{ port.description }}</option>
-      {% endfor %}
+      {{ options_html }}
     </select><br>
     <button type="submit">Select Ports</button>
   </form>
   <pre class="ascii-art">{{ bottom_ascii }}</pre>
   <script>
-    // Dynamically refresh available USB port list every 0.5 seconds
+    function renderPortOptions(data) {
+      ['port1','port2','port3'].forEach(name => {
+        const select = document.getElementById(name);
+        if (!select) return;
+        const current = select.value;
+        // rebuild options
+        select.innerHTML = '<option value="">--None--</option>' +
+          data.ports.map(p => `<option value="${p.device}">${p.device} - ${p.description}</option>`).join('');
+        select.value = current;
+      });
+    }
     function refreshPortOptions() {
       fetch('/api/ports')
         .then(res => res.json())
-        .then(data => {
-          ['port1','port2','port3'].forEach(name => {
-            const select = document.getElementById(name);
-            if (!select) return;
-            const current = select.value;
-            // rebuild options
-            select.innerHTML = '<option value="">--None--</option>' +
-              data.ports.map(p => `<option value="${p.device}">${p.device} - ${p.description}</option>`).join('');
-            select.value = current;
-          });
-        })
+        .then(renderPortOptions)
         .catch(err => console.error('Error refreshing ports:', err));
     }
-    // Refresh ports every 500ms until the user interacts
-    var refreshInterval = setInterval(refreshPortOptions, 500);
+    // The server pushes the USB port list whenever it changes; fall back to
+    // polling every 500ms on browsers without EventSource.
+    var portStream = null;
+    var refreshInterval = null;
+    if (window.EventSource) {
+      portStream = new EventSource('/api/ports/stream');
+      portStream.onmessage = function(e) { renderPortOptions(JSON.parse(e.data)); };
+    } else {
+      refreshInterval = setInterval(refreshPortOptions, 500);
+      window.onload = refreshPortOptions;
+    }
+    function stopPortRefresh() {
+      if (portStream) { portStream.close(); portStream = null; }
+      clearInterval(refreshInterval);
+    }
     ['port1','port2','port3'].forEach(function(name) {
       var select = document.getElementById(name);
       if (select) {
         // Stop auto-refresh on user interaction (focus, mouse, or touch)
         ['focus', 'mousedown', 'touchstart'].forEach(function(evt) {
-          select.addEventListener(evt, function() { clearInterval(refreshInterval); });
+          select.addEventListener(evt, stopPortRefresh, {passive: true});
         });
-        select.addEventListener('change', function() { clearInterval(refreshInterval); });
+        select.addEventListener('change', stopPortRefresh);
       }
     });
-    window.onload = function() {
-      refreshPortOptions();
-    }
   </script>
 </body>
 </html>
 '''
+# Compile the selection page once; render_template_string would re-parse it on every request.
+PORT_SELECTION_TEMPLATE = app.jinja_env.from_string(PORT_SELECTION_PAGE)
 
     # Updated: The main mapping page now shows serial statuses for all selected USB devices.
 HTML_PAGE = '''
@@ -480,7 +643,125 @@ HTML_PAGE = '''
   <title>Mesh Mapper</title>
   <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" crossorigin=""/>
   <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js" crossorigin=""></script>
-  <style>
+  <link rel="stylesheet" href="/mesh-mapper.css">
+</head>
+<body>
+<div id="map"></div>
+<template id="observerPopupTpl">
+  <div>
+    <strong>Observer Location</strong><br>
+    <label for="observerEmoji">Select Observer Icon:</label>
+    <select id="observerEmoji" data-action="observer-emoji">
+       <option value="😎">😎</option>
+       <option value="👽">👽</option>
+       <option value="🤖">🤖</option>
+       <option value="🏎️">🏎️</option>
+       <option value="🕵️‍♂️">🕵️‍♂️</option>
+       <option value="🥷">🥷</option>
+       <option value="👁️">👁️</option>
+    </select><br>
+    <button id="lock-observer" data-action="lock-observer">Lock on Observer</button>
+    <button id="unlock-observer" data-action="unlock-observer">Unlocked Observer</button>
+  </div>
+</template>
+<div id="layerControl">
+  <label>Basemap:</label>
+  <select id="layerSelect">
+    <option value="osmStandard">OSM Standard</option>
+    <option value="osmHumanitarian">OSM Humanitarian</option>
+    <option value="cartoPositron">CartoDB Positron</option>
+    <option value="cartoDarkMatter">CartoDB Dark Matter</option>
+    <option value="esriWorldImagery" selected>Esri World Imagery</option>
+    <option value="esriWorldTopo">Esri World TopoMap</option>
+    <option value="esriDarkGray">Esri Dark Gray Canvas</option>
+    <option value="openTopoMap">OpenTopoMap</option>
+  </select>
+</div>
+<div id="filterBox">
+  <div id="filterHeader">
+    <h3>Drones</h3>
+    <span id="filterToggle" style="cursor: pointer; font-size: 20px;">[-]</span>
+  </div>
+  <div id="filterContent">
+    <h3>Active Drones</h3>
+    <div id="activePlaceholder" class="placeholder"></div>
+    <h3>Inactive Drones</h3>
+    <div id="inactivePlaceholder" class="placeholder"></div>
+    <!-- Downloads Section -->
+    <div id="downloadSection">
+      <h4 class="downloadHeader">Download Logs</h4>
+      <div id="downloadButtons">
+        <button id="downloadCsv" data-href="/download/csv">CSV</button>
+        <button id="downloadKml" data-href="/download/kml">KML</button>
+        <button id="downloadAliases" data-href="/download/aliases">Aliases</button>
+      </div>
+    </div>
+    <div style="margin-top:8px; display:flex; align-items:center; justify-content:center; height:20px;">
+      <label style="color:lime; font-family:monospace; margin-right:8px;">Node Mode</label>
+      <label class="switch">
+        <input type="checkbox" id="nodeModeMainSwitch">
+        <span class="slider"></span>
+      </label>
+    </div>
+    <div style="color:#FF00FF; font-family:monospace; font-size:0.75em; white-space:normal; line-height:1.2; margin-top:4px; text-align:center;">
+      Polls detections every second instead of every 200 ms to reduce CPU/battery use and optimizes API for Node Mode.
+    </div>
+    <div id="zmqSection" style="margin-top:8px; text-align:center;">
+      <div style="margin-top:8px; display:flex; align-items:center; justify-content:center; height:20px;">
+        <label style="color:lime; font-family:monospace; margin-right:8px;">ZMQ Mode</label>
+        <label class="switch">
+          <input type="checkbox" id="zmqModeSwitch">
+          <span class="slider"></span>
+        </label>
+      </div>
+      <div style="margin-top:5px;">
+        <div style="display:flex; justify-content:center; align-items:center; margin-top:5px;">
+          <input type="text" id="zmqIP" placeholder="127.0.0.1" style="background-color:#222;color:#FF00FF;border:1px solid #FF00FF;width:55%;padding:4px;margin-right:5px;">
+          <span style="color:lime;">:</span>
+          <input type="text" id="zmqPort" placeholder="4224" style="background-color:#222;color:#FF00FF;border:1px solid #FF00FF;width:25%;padding:4px;margin-left:5px;">
+        </div>
+        <button id="applyZmqSettings" style="margin-top:5px;width:40%;padding:5px;border:1px solid lime;background:#333;color:lime;font-family:monospace;cursor:pointer;border-radius:5px;">Update ZMQ</button>
+      </div>
+      <div style="color:#FF00FF;font-family:monospace;font-size:0.75em;white-space:normal;line-height:1.2;margin-top:4px;text-align:center;">
+        Connect to ZMQ decoder via direct IP connection
+      </div>
+    </div>
+    <!-- Staleout Slider -->
+    <div style="margin-top:8px; text-align:center;">
+      <label style="color:lime; font-family:monospace; margin-bottom:4px; display:block;">Staleout Time</label>
+      <input type="range" id="staleoutSlider" min="1" max="5" step="1" value="1" 
+             style="width:80%; border:1px solid lime; margin-bottom:4px;">
+      <div id="staleoutValue" style="color:lime; font-family:monospace;">1 min</div>
+    </div>
+  </div>
+</div>
+<div id="serialStatus">
+  <!-- USB port statuses will be injected here -->
+</div>
+<script src="/mesh-mapper.js"></script>
+<script>
+  // One click handler for all download buttons: purple flash, then download
+  document.getElementById('downloadButtons').addEventListener('click', function(e) {
+    const button = e.target.closest('button[data-href]');
+    if (!button) return;
+    button.classList.remove('flash');
+    void button.offsetWidth;
+    button.classList.add('flash');
+    window.location.href = button.dataset.href;
+  });
+  if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register('/sw.js')
+      .then(reg => console.log('Service Worker registered', reg))
+      .catch(err => console.error('Service Worker registration failed', err));
+  }
+</script>
+</body>
+</html>
+'''
+
+# Stylesheet and script for the mapping page, served from their own routes so
+# the browser can cache them independently of the HTML shell.
+MESH_MAPPER_CSS = '''
     /* Hide tile seams on all map layers */
     .leaflet-tile {
       border: none !important;
@@ -753,6 +1034,13 @@ HTML_PAGE = '''
       outline: none;
       caret-color: transparent;
     }
+    /* Purple flash on click (restarted by re-adding the class) */
+    #downloadButtons button.flash {
+      animation: downloadFlash 0.3s steps(1, end);
+    }
+    @keyframes downloadFlash {
+      from { background-color: purple; }
+    }
     /* Gradient blue border flush with heading */
     #downloadSection {
       padding: 0 8px 8px 8px;  /* no top padding so border is flush with heading */
@@ -895,85 +1183,17 @@ HTML_PAGE = '''
       padding: 4px 6px;
       margin: 2px 4px 2px 0;
     }
-  </style>
-</head>
-<body>
-<div id="map"></div>
-<div id="layerControl">
-  <label>Basemap:</label>
-  <select id="layerSelect">
-    <option value="osmStandard">OSM Standard</option>
-    <option value="osmHumanitarian">OSM Humanitarian</option>
-    <option value="cartoPositron">CartoDB Positron</option>
-    <option value="cartoDarkMatter">CartoDB Dark Matter</option>
-    <option value="esriWorldImagery" selected>Esri World Imagery</option>
-    <option value="esriWorldTopo">Esri World TopoMap</option>
-    <option value="esriDarkGray">Esri Dark Gray Canvas</option>
-    <option value="openTopoMap">OpenTopoMap</option>
-  </select>
-</div>
-<div id="filterBox">
-  <div id="filterHeader">
-    <h3>Drones</h3>
-    <span id="filterToggle" style="cursor: pointer; font-size: 20px;">[-]</span>
-  </div>
-  <div id="filterContent">
-    <h3>Active Drones</h3>
-    <div id="activePlaceholder" class="placeholder"></div>
-    <h3>Inactive Drones</h3>
-    <div id="inactivePlaceholder" class="placeholder"></div>
-    <!-- Downloads Section -->
-    <div id="downloadSection">
-      <h4 class="downloadHeader">Download Logs</h4>
-      <div id="downloadButtons">
-        <button id="downloadCsv">CSV</button>
-        <button id="downloadKml">KML</button>
-        <button id="downloadAliases">Aliases</button>
-      </div>
-    </div>
-    <div style="margin-top:8px; display:flex; align-items:center; justify-content:center; height:20px;">
-      <label style="color:lime; font-family:monospace; margin-right:8px;">Node Mode</label>
-      <label class="switch">
-        <input type="checkbox" id="nodeModeMainSwitch">
-        <span class="slider"></span>
-      </label>
-    </div>
-    <div style="color:#FF00FF; font-family:monospace; font-size:0.75em; white-space:normal; line-height:1.2; margin-top:4px; text-align:center;">
-      Polls detections every second instead of every 200 ms to reduce CPU/battery use and optimizes API for Node Mode.
-    </div>
-    <div id="zmqSection" style="margin-top:8px; text-align:center;">
-      <div style="margin-top:8px; display:flex; align-items:center; justify-content:center; height:20px;">
-        <label style="color:lime; font-family:monospace; margin-right:8px;">ZMQ Mode</label>
-        <label class="switch">
-          <input type="checkbox" id="zmqModeSwitch">
-          <span class="slider"></span>
-        </label>
-      </div>
-      <div style="margin-top:5px;">
-        <div style="display:flex; justify-content:center; align-items:center; margin-top:5px;">
-          <input type="text" id="zmqIP" placeholder="127.0.0.1" style="background-color:#222;color:#FF00FF;border:1px solid #FF00FF;width:55%;padding:4px;margin-right:5px;">
-          <span style="color:lime;">:</span>
-          <input type="text" id="zmqPort" placeholder="4224" style="background-color:#222;color:#FF00FF;border:1px solid #FF00FF;width:25%;padding:4px;margin-left:5px;">
-        </div>
-        <button id="applyZmqSettings" style="margin-top:5px;width:40%;padding:5px;border:1px solid lime;background:#333;color:lime;font-family:monospace;cursor:pointer;border-radius:5px;">Update ZMQ</button>
-      </div>
-      <div style="color:#FF00FF;font-family:monospace;font-size:0.75em;white-space:normal;line-height:1.2;margin-top:4px;text-align:center;">
-        Connect to ZMQ decoder via direct IP connection
-      </div>
-    </div>
-    <!-- Staleout Slider -->
-    <div style="margin-top:8px; text-align:center;">
-      <label style="color:lime; font-family:monospace; margin-bottom:4px; display:block;">Staleout Time</label>
-      <input type="range" id="staleoutSlider" min="1" max="5" step="1" value="1" 
-             style="width:80%; border:1px solid lime; margin-bottom:4px;">
-      <div id="staleoutValue" style="color:lime; font-family:monospace;">1 min</div>
-    </div>
-  </div>
-</div>
-<div id="serialStatus">
-  <!-- USB port statuses will be injected here -->
-</div>
-<script>
+
+    /* Purple flash on a freshly saved alias (restarted by re-adding the class) */
+    .alias-flash {
+      animation: aliasFlash 0.3s steps(1, end);
+    }
+    @keyframes aliasFlash {
+      from { background-color: purple; }
+    }
+'''
+
+MESH_MAPPER_JS = '''
   // Round tile positions to integer pixels to eliminate seams
   L.DomUtil.setPosition = (function() {
     var original = L.DomUtil.setPosition;
@@ -982,13 +1202,35 @@ HTML_PAGE = '''
       original.call(this, el, rounded);
     };
   })();
+// Debounced localStorage writes. Callers register a key with a function that
+// returns its current value (strings are stored as-is, anything else as
+// JSON); pending keys are written together once the browser is idle (300 ms
+// at the latest) and flushed on page hide.
+const pendingWrites = new Map();
+let persistScheduled = false;
+function persist(key, valueFn) {
+  pendingWrites.set(key, valueFn);
+  if (persistScheduled) return;
+  persistScheduled = true;
+  if (window.requestIdleCallback) { requestIdleCallback(flushPersist, { timeout: 300 }); }
+  else { setTimeout(flushPersist, 300); }
+}
+function flushPersist() {
+  persistScheduled = false;
+  pendingWrites.forEach((valueFn, key) => {
+    const value = valueFn();
+    localStorage.setItem(key, typeof value === 'string' ? value : JSON.stringify(value));
+  });
+  pendingWrites.clear();
+}
+window.addEventListener('pagehide', flushPersist);
 // --- Node Mode Main Switch & Polling Interval Sync ---
 document.addEventListener('DOMContentLoaded', () => {
   // restore follow-lock on reload
   const storedLock = localStorage.getItem('followLock');
   if (storedLock) {
     try {
-      followLock = JSON.parse(storedLock);
+      followLock = parseFollowLock(storedLock);
       if (followLock.type === 'observer') {
         updateObserverPopupButtons();
       } else if (followLock.type === 'drone' || followLock.type === 'pilot') {
@@ -1007,16 +1249,24 @@ document.addEventListener('DOMContentLoaded', () => {
     mainSwitch.onchange = () => {
       const enabled = mainSwitch.checked;
       localStorage.setItem('nodeMode', enabled);
-      clearInterval(updateDataInterval);
-      updateDataInterval = setInterval(updateData, enabled ? 1000 : 200);
+      setUpdateDataPeriod(enabled ? 1000 : 200);
       // Sync popup toggle if open
       const popupSwitch = document.getElementById('nodeModePopupSwitch');
       if (popupSwitch) popupSwitch.checked = enabled;
     };
   }
   // Start polling based on current setting
-  updateData();
-  updateDataInterval = setInterval(updateData, mainSwitch && mainSwitch.checked ? 1000 : 200);
+  updateDataPeriod = mainSwitch && mainSwitch.checked ? 1000 : 200;
+  updateDataTask = scheduleTask(updateDataLoop, updateDataPeriod);
+  runTaskSoon(updateDataTask);
+  // rAF already stops the scheduler in background tabs; poll straight
+  // away when the page is shown again instead of waiting out the period.
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'visible') {
+      pollDetectionsNow();
+      updateSerialStatus();
+    }
+  });
 
   // ZMQ Settings
   if (localStorage.getItem('zmqEnabled') === null) { localStorage.setItem('zmqEnabled','false'); }
@@ -1078,46 +1328,92 @@ document.addEventListener('DOMContentLoaded', () => {
     };
   }
 });
-// Optimize tile loading for smooth zoom and aggressive preloading
+// Optimize tile loading for smooth zoom
 L.Map.prototype.options.fadeAnimation = false;
 L.TileLayer.prototype.options.updateWhenZooming = true;
 L.TileLayer.prototype.options.updateInterval = 50;
-L.TileLayer.prototype.options.keepBuffer = 200;
-// Prevent tile unload and reuse cached tiles to eliminate blanking
-L.GridLayer.prototype.options.unloadInvisibleTiles = false;
-L.TileLayer.prototype.options.reuseTiles = true;
+// Keep a small ring of off-screen tiles to avoid blanking on pan; larger
+// values keep thousands of <img> tiles and their decoded bitmaps alive
+L.TileLayer.prototype.options.keepBuffer = 4;
 L.TileLayer.prototype.options.updateWhenIdle = false;
-// Aggressively preload surrounding tiles during zoom
-L.TileLayer.prototype.options.preload = true;
-// On window load, restore persisted detection data (trackedPairs) and re-add markers.
-window.onload = function() {
+// Detections are persisted in IndexedDB, one record per mac, so a poll only
+// writes the macs that changed and deletes the ones the server no longer
+// reports. localStorage is the fallback when IndexedDB is unavailable.
+const idbReady = new Promise((resolve) => {
+  if (!window.indexedDB) { resolve(null); return; }
+  const req = indexedDB.open('mesh-mapper', 1);
+  req.onupgradeneeded = () => { req.result.createObjectStore('trackedPairs'); };
+  req.onsuccess = () => resolve(req.result);
+  req.onerror = () => resolve(null);
+});
+
+// Mac count of the last saved poll; a drop means stored macs need pruning
+let savedMacCount = 0;
+function saveTrackedPairs(data, macs) {
+  idbReady.then(db => {
+    if (!db) { persist('trackedPairs', () => window.tracked_pairs); return; }
+    const store = db.transaction('trackedPairs', 'readwrite').objectStore('trackedPairs');
+    macs.forEach(mac => store.put(data[mac], mac));
+    // Drop macs missing from this response so reloads don't resurrect them
+    const keysReq = store.getAllKeys();
+    keysReq.onsuccess = () => {
+      keysReq.result.forEach(key => { if (!(key in data)) store.delete(key); });
+    };
+  });
+}
+
+async function loadTrackedPairs() {
+  const db = await idbReady;
+  if (db) {
+    const pairs = await new Promise((resolve) => {
+      const found = {};
+      const req = db.transaction('trackedPairs').objectStore('trackedPairs').openCursor();
+      req.onsuccess = () => {
+        const cursor = req.result;
+        if (cursor) { found[cursor.key] = cursor.value; cursor.continue(); }
+        else { resolve(found); }
+      };
+      req.onerror = () => resolve(found);
+    });
+    if (Object.keys(pairs).length) return pairs;
+  }
+  // Nothing in IndexedDB yet: use (and migrate away from) the old localStorage copy
   let stored = localStorage.getItem("trackedPairs");
-  if (stored) {
-    try {
-      let storedPairs = JSON.parse(stored);
-      window.tracked_pairs = storedPairs;
-      for (const mac in storedPairs) {
-        let det = storedPairs[mac];
-        let color = get_color_for_mac(mac);
-        // Restore drone marker if valid coordinates exist.
-        if (det.drone_lat && det.drone_long && det.drone_lat != 0 && det.drone_long != 0) {
-          if (!droneMarkers[mac]) {
-            droneMarkers[mac] = L.marker([det.drone_lat, det.drone_long], {icon: createIcon('🛸', color), pane: 'droneIconPane'})
-                                  .bindPopup(generatePopupContent(det, 'drone'))
-                                  .addTo(map);
-          }
-        }
-        // Restore pilot marker if valid coordinates exist.
-        if (det.pilot_lat && det.pilot_long && det.pilot_lat != 0 && det.pilot_long != 0) {
-          if (!pilotMarkers[mac]) {
-            pilotMarkers[mac] = L.marker([det.pilot_lat, det.pilot_long], {icon: createIcon('👤', color), pane: 'pilotIconPane'})
-                                  .bindPopup(generatePopupContent(det, 'pilot'))
-                                  .addTo(map);
-          }
-        }
+  if (!stored) return null;
+  if (db) { localStorage.removeItem("trackedPairs"); }
+  try { return JSON.parse(stored); }
+  catch(e) {
+    console.error("Error parsing trackedPairs from localStorage", e);
+    return null;
+  }
+}
+
+// On window load, restore persisted detection data (trackedPairs) and re-add markers.
+window.onload = async function() {
+  const storedPairs = await loadTrackedPairs();
+  if (!storedPairs) return;
+  // A poll may already have landed while the store was being read
+  if (!window.tracked_pairs) { window.tracked_pairs = storedPairs; }
+  for (const mac in storedPairs) {
+    let det = storedPairs[mac];
+    let color = get_color_for_mac(mac);
+    // Restore drone marker if valid coordinates exist.
+    if (det.drone_lat && det.drone_long && det.drone_lat != 0 && det.drone_long != 0) {
+      if (!droneMarkers[mac]) {
+        droneMarkers[mac] = L.marker([det.drone_lat, det.drone_long], {icon: createIcon('🛸', color), pane: 'droneIconPane'})
+                              .bindPopup(detectionPopupContent)
+                              .addTo(map);
+        setPopupDetection(droneMarkers[mac], det, 'drone');
+      }
+    }
+    // Restore pilot marker if valid coordinates exist.
+    if (det.pilot_lat && det.pilot_long && det.pilot_lat != 0 && det.pilot_long != 0) {
+      if (!pilotMarkers[mac]) {
+        pilotMarkers[mac] = L.marker([det.pilot_lat, det.pilot_long], {icon: createIcon('👤', color), pane: 'pilotIconPane'})
+                              .bindPopup(detectionPopupContent)
+                              .addTo(map);
+        setPopupDetection(pilotMarkers[mac], det, 'pilot');
       }
-    } catch(e) {
-      console.error("Error parsing trackedPairs from localStorage", e);
     }
   }
 }
@@ -1127,9 +1423,40 @@ if (localStorage.getItem('colorOverrides')) {
   catch(e){ window.colorOverrides = {}; }
 } else { window.colorOverrides = {}; }
 
+// historicalDrones is stored as {v, keys, rows}: one array per mac holding the
+// values of HISTORICAL_KEYS in order, plus an object of any other fields.
+const HISTORICAL_KEYS = ['drone_lat', 'drone_long', 'pilot_lat', 'pilot_long', 'basic_id', 'last_update', 'lockTime', 'userLocked'];
+function packHistoricalDrones(drones) {
+  const rows = {};
+  for (const mac in drones) {
+    const det = drones[mac];
+    const row = HISTORICAL_KEYS.map(k => det[k]);
+    const extra = {};
+    let hasExtra = false;
+    for (const k in det) {
+      if (k !== 'mac' && HISTORICAL_KEYS.indexOf(k) === -1) { extra[k] = det[k]; hasExtra = true; }
+    }
+    if (hasExtra) row.push(extra);
+    rows[mac] = row;
+  }
+  return { v: 1, keys: HISTORICAL_KEYS, rows: rows };
+}
+function unpackHistoricalDrones(stored) {
+  // Older pages stored the plain mac -> detection object
+  if (!stored || stored.v !== 1) return stored || {};
+  const drones = {};
+  for (const mac in stored.rows) {
+    const row = stored.rows[mac];
+    const det = Object.assign({ mac: mac }, row[stored.keys.length]);
+    stored.keys.forEach((k, i) => { if (row[i] !== null && row[i] !== undefined) det[k] = row[i]; });
+    drones[mac] = det;
+  }
+  return drones;
+}
+
 // Restore historical drones from localStorage
 if (localStorage.getItem('historicalDrones')) {
-  try { window.historicalDrones = JSON.parse(localStorage.getItem('historicalDrones')); }
+  try { window.historicalDrones = unpackHistoricalDrones(JSON.parse(localStorage.getItem('historicalDrones'))); }
   catch(e) { window.historicalDrones = {}; }
 } else {
   window.historicalDrones = {};
@@ -1173,30 +1500,23 @@ function safeSetView(latlng, zoom=18) {
 
 var followLock = { type: null, id: null, enabled: false };
 
+// followLock is stored as a compact "type|id|enabled" string
+function followLockString() {
+  return (followLock.type || '') + '|' + (followLock.id || '') + '|' + (followLock.enabled ? 1 : 0);
+}
+function parseFollowLock(stored) {
+  // Older pages stored the object as JSON
+  if (stored.charAt(0) === '{') return JSON.parse(stored);
+  const [type, id, enabled] = stored.split('|');
+  return { type: type || null, id: id || null, enabled: enabled === '1' };
+}
+
+// The observer popup is cloned from a static <template> in the page
 function generateObserverPopup() {
-  var observerLocked = (followLock.enabled && followLock.type === 'observer');
-  var storedObserverEmoji = localStorage.getItem('observerEmoji') || "😎";
-  return `
-  <div>
-    <strong>Observer Location</strong><br>
-    <label for="observerEmoji">Select Observer Icon:</label>
-    <select id="observerEmoji" onchange="updateObserverEmoji()">
-       <option value="😎" ${storedObserverEmoji === "😎" ? "selected" : ""}>😎</option>
-       <option value="👽" ${storedObserverEmoji === "👽" ? "selected" : ""}>👽</option>
-       <option value="🤖" ${storedObserverEmoji === "🤖" ? "selected" : ""}>🤖</option>
-       <option value="🏎️" ${storedObserverEmoji === "🏎️" ? "selected" : ""}>🏎️</option>
-       <option value="🕵️‍♂️" ${storedObserverEmoji === "🕵️‍♂️" ? "selected" : ""}>🕵️‍♂️</option>
-       <option value="🥷" ${storedObserverEmoji === "🥷" ? "selected" : ""}>🥷</option>
-       <option value="👁️" ${storedObserverEmoji === "👁️" ? "selected" : ""}>👁️</option>
-    </select><br>
-    <button id="lock-observer" onclick="lockObserver()" style="background-color: ${observerLocked ? 'green' : ''};">
-      ${observerLocked ? 'Locked on Observer' : 'Lock on Observer'}
-    </button>
-    <button id="unlock-observer" onclick="unlockObserver()" style="background-color: ${observerLocked ? '' : 'green'};">
-      ${observerLocked ? 'Unlock Observer' : 'Unlocked Observer'}
-    </button>
-  </div>
-  `;
+  const node = document.importNode(document.getElementById('observerPopupTpl').content, true).firstElementChild;
+  node.querySelector('#observerEmoji').value = localStorage.getItem('observerEmoji') || "😎";
+  applyObserverLockButtons(node.querySelector('#lock-observer'), node.querySelector('#unlock-observer'));
+  return node;
 }
 
 // Updated function: now saves the selected observer icon to localStorage and updates the observer marker.
@@ -1210,19 +1530,66 @@ function updateObserverEmoji() {
 }
 
 function lockObserver() { followLock = { type: 'observer', id: 'observer', enabled: true }; updateObserverPopupButtons();
-  localStorage.setItem('followLock', JSON.stringify(followLock));
+  persist('followLock', followLockString);
 }
 function unlockObserver() { followLock = { type: null, id: null, enabled: false }; updateObserverPopupButtons();
-  localStorage.setItem('followLock', JSON.stringify(followLock));
+  persist('followLock', followLockString);
 }
+// Leveled DOM batch: all level 0 jobs (element lookups) run before level 1
+// jobs (style/text writes) in one animation frame, so a lock toggle touching
+// several button pairs costs a single style recalc.
+const domBatch = {
+  levels: [[], []],
+  scheduled: false,
+  add(level, fn) { this.levels[level].push(fn); },
+  schedule() {
+    if (this.scheduled) return;
+    this.scheduled = true;
+    requestAnimationFrame(() => this.flush());
+  },
+  flush() {
+    this.scheduled = false;
+    this.levels.forEach(jobs => { while (jobs.length) { jobs.shift()(); } });
+  }
+};
+
 function updateObserverPopupButtons() {
+  let lockBtn, unlockBtn;
+  domBatch.add(0, () => {
+    lockBtn = document.getElementById("lock-observer");
+    unlockBtn = document.getElementById("unlock-observer");
+  });
+  domBatch.add(1, () => { applyObserverLockButtons(lockBtn, unlockBtn); });
+  domBatch.schedule();
+}
+function applyObserverLockButtons(lockBtn, unlockBtn) {
   var observerLocked = (followLock.enabled && followLock.type === 'observer');
-  var lockBtn = document.getElementById("lock-observer");
-  var unlockBtn = document.getElementById("unlock-observer");
   if(lockBtn) { lockBtn.style.backgroundColor = observerLocked ? "green" : ""; lockBtn.textContent = observerLocked ? "Locked on Observer" : "Lock on Observer"; }
   if(unlockBtn) { unlockBtn.style.backgroundColor = observerLocked ? "" : "green"; unlockBtn.textContent = observerLocked ? "Unlock Observer" : "Unlocked Observer"; }
 }
 
+// Static popup markup, built once instead of on every popup render
+const FAA_FIELDS = ["makeName", "modelName", "series", "trackingNumber", "complianceCategories", "updatedAt"];
+const FAA_BOX_OPEN = '<div style="border:2px solid #FF69B4; padding:5px; margin:5px 0;">';
+const FAA_NO_DATA_HTML = FAA_BOX_OPEN + 'No FAA data available</div>';
+const POPUP_DIVIDER_HTML = '<div style="border-top:2px solid lime; margin:10px 0;"></div>';
+// Detection fields that are rendered elsewhere in the popup (or not at all)
+const POPUP_HIDDEN_KEYS = new Set(['mac', 'basic_id', 'last_update', 'userLocked', 'lockTime', 'faa_data', 'color']);
+
+function renderFaaData(faaData) {
+  let item = null;
+  if (faaData.data && faaData.data.items && faaData.data.items.length > 0) {
+    item = faaData.data.items[0];
+  }
+  if (!item) { return FAA_NO_DATA_HTML; }
+  let html = FAA_BOX_OPEN;
+  FAA_FIELDS.forEach(function(field) {
+    let value = item[field] !== undefined ? item[field] : "";
+    html += `<div><span style="color:#FF00FF;">${field}:</span> <span style="color:#00FF00;">${value}</span></div>`;
+  });
+  return html + '</div>';
+}
+
 function generatePopupContent(detection, markerType) {
   let content = '';
   let aliasText = aliases[detection.mac] ? aliases[detection.mac] : "No Alias";
@@ -1233,35 +1600,20 @@ function generatePopupContent(detection, markerType) {
       content += '<div style="border:2px solid #FF00FF; padding:5px; margin:5px 0;">FAA RemoteID: ' + detection.basic_id + '</div>';
     }
     if (detection.basic_id) {
-      content += '<button onclick="queryFaaAPI(\\\'' + detection.mac + '\\\', \\\'' + detection.basic_id + '\\\')" id="queryFaaButton_' + detection.mac + '">Query FAA API</button>';
+      content += '<button data-action="query-faa" data-mac="' + detection.mac + '" data-basic-id="' + detection.basic_id + '" id="queryFaaButton_' + detection.mac + '">Query FAA API</button>';
     }
     content += '<div id="faaResult_' + detection.mac + '" style="margin-top:5px;">';
     if (detection.faa_data) {
-      let faaData = detection.faa_data;
-      let item = null;
-      if (faaData.data && faaData.data.items && faaData.data.items.length > 0) {
-        item = faaData.data.items[0];
-      }
-      if (item) {
-        const fields = ["makeName", "modelName", "series", "trackingNumber", "complianceCategories", "updatedAt"];
-        content += '<div style="border:2px solid #FF69B4; padding:5px; margin:5px 0;">';
-        fields.forEach(function(field) {
-          let value = item[field] !== undefined ? item[field] : "";
-          content += `<div><span style="color:#FF00FF;">${field}:</span> <span style="color:#00FF00;">${value}</span></div>`;
-        });
-        content += '</div>';
-      } else {
-        content += '<div style="border:2px solid #FF69B4; padding:5px; margin:5px 0;">No FAA data available</div>';
-      }
+      content += renderFaaData(detection.faa_data);
     }
     content += '</div><br>';
   }
   
+  const parts = [];
   for (const key in detection) {
-    if (['mac', 'basic_id', 'last_update', 'userLocked', 'lockTime', 'faa_data'].indexOf(key) === -1) {
-      content += key + ': ' + detection[key] + '<br>';
-    }
+    if (!POPUP_HIDDEN_KEYS.has(key)) { parts.push(key, ': ', detection[key], '<br>'); }
   }
+  content += parts.join('');
   
   if (detection.drone_lat && detection.drone_long && detection.drone_lat != 0 && detection.drone_long != 0) {
     content += '<a target="_blank" href="https://www.google.com/maps/search/?api=1&query=' 
@@ -1274,45 +1626,39 @@ function generatePopupContent(detection, markerType) {
   
   content += `<hr style="border: 1px solid lime;">
               <label for="aliasInput">Alias:</label>
-              <input type="text" id="aliasInput" onclick="event.stopPropagation();" ontouchstart="event.stopPropagation();" 
+              <input type="text" id="aliasInput"
                      style="background-color: #222; color: #87CEEB; border: 1px solid #FF00FF;" 
                      value="${aliases[detection.mac] ? aliases[detection.mac] : ''}"><br>
-              <button onclick="saveAlias('${detection.mac}')">Save Alias</button>
-              <button onclick="clearAlias('${detection.mac}')">Clear Alias</button><br>`;
+              <button data-action="save-alias" data-mac="${detection.mac}">Save Alias</button>
+              <button data-action="clear-alias" data-mac="${detection.mac}">Clear Alias</button><br>`;
   
-  content += `<div style="border-top:2px solid lime; margin:10px 0;"></div>`;
+  content += POPUP_DIVIDER_HTML;
   
   var isDroneLocked = (followLock.enabled && followLock.type === 'drone' && followLock.id === detection.mac);
-  var droneLockButton = `<button id="lock-drone-${detection.mac}" onclick="lockMarker('drone', '${detection.mac}')" 
+  var droneLockButton = `<button id="lock-drone-${detection.mac}" data-action="lock" data-type="drone" data-mac="${detection.mac}" 
                       style="background-color: ${isDroneLocked ? 'green' : ''};">
                       ${isDroneLocked ? 'Locked on Drone' : 'Lock on Drone'}
                     </button>`;
-  var droneUnlockButton = `<button id="unlock-drone-${detection.mac}" onclick="unlockMarker('drone', '${detection.mac}')" 
+  var droneUnlockButton = `<button id="unlock-drone-${detection.mac}" data-action="unlock" data-type="drone" data-mac="${detection.mac}" 
                       style="background-color: ${isDroneLocked ? '' : 'green'};">
                       ${isDroneLocked ? 'Unlock Drone' : 'Unlocked Drone'}
                     </button>`;
   var isPilotLocked = (followLock.enabled && followLock.type === 'pilot' && followLock.id === detection.mac);
-  var pilotLockButton = `<button id="lock-pilot-${detection.mac}" onclick="lockMarker('pilot', '${detection.mac}')" 
+  var pilotLockButton = `<button id="lock-pilot-${detection.mac}" data-action="lock" data-type="pilot" data-mac="${detection.mac}" 
                       style="background-color: ${isPilotLocked ? 'green' : ''};">
                       ${isPilotLocked ? 'Locked on Pilot' : 'Lock on Pilot'}
                     </button>`;
-  var pilotUnlockButton = `<button id="unlock-pilot-${detection.mac}" onclick="unlockMarker('pilot', '${detection.mac}')" 
+  var pilotUnlockButton = `<button id="unlock-pilot-${detection.mac}" data-action="unlock" data-type="pilot" data-mac="${detection.mac}" 
                       style="background-color: ${isPilotLocked ? '' : 'green'};">
                       ${isPilotLocked ? 'Unlock Pilot' : 'Unlocked Pilot'}
                     </button>`;
   content += `${droneLockButton} ${droneUnlockButton} <br>
                 ${pilotLockButton} ${pilotUnlockButton}`;
   
-  let defaultHue = colorOverrides[detection.mac] !== undefined ? colorOverrides[detection.mac] : (function(){
-      let hash = 0;
-      for (let i = 0; i < detection.mac.length; i++){
-          hash = detection.mac.charCodeAt(i) + ((hash << 5) - hash);
-      }
-      return Math.abs(hash) % 360;
-  })();
+  let defaultHue = colorOverrides[detection.mac] !== undefined ? colorOverrides[detection.mac] : hueFor(detection.mac);
   content += `<div style="margin-top:10px;">
     <label for="colorSlider_${detection.mac}" style="display:block; color:lime;">Color:</label>
-    <input type="range" id="colorSlider_${detection.mac}" min="0" max="360" value="${defaultHue}" style="width:100%;" onchange="updateColor('${detection.mac}', this.value)">
+    <input type="range" id="colorSlider_${detection.mac}" min="0" max="360" value="${defaultHue}" style="width:100%;" data-action="color" data-mac="${detection.mac}">
   </div>`;
 
       // Node Mode toggle in popup
@@ -1339,23 +1685,7 @@ async function queryFaaAPI(mac, remote_id) {
         if (result.status === "ok") {
             const faaDiv = document.getElementById("faaResult_" + mac);
             if (faaDiv) {
-                let faaData = result.faa_data;
-                let item = null;
-                if (faaData.data && faaData.data.items && faaData.data.items.length > 0) {
-                  item = faaData.data.items[0];
-                }
-                if (item) {
-                  const fields = ["makeName", "modelName", "series", "trackingNumber", "complianceCategories", "updatedAt"];
-                  let html = '<div style="border:2px solid #FF69B4; padding:5px; margin:5px 0;">';
-                  fields.forEach(function(field) {
-                    let value = item[field] !== undefined ? item[field] : "";
-                    html += `<div><span style="color:#FF00FF;">${field}:</span> <span style="color:#00FF00;">${value}</span></div>`;
-                  });
-                  html += '</div>';
-                  faaDiv.innerHTML = html;
-                } else {
-                  faaDiv.innerHTML = '<div style="border:2px solid #FF69B4; padding:5px; margin:5px 0;">No FAA data available</div>';
-                }
+                faaDiv.innerHTML = renderFaaData(result.faa_data);
             }
         } else {
             alert("FAA API error: " + result.message);
@@ -1380,7 +1710,7 @@ function lockMarker(markerType, id) {
   // Update buttons for this id in both drone and pilot sections
   updateMarkerButtons('drone', id);
   updateMarkerButtons('pilot', id);
-  localStorage.setItem('followLock', JSON.stringify(followLock));
+  persist('followLock', followLockString);
   // If another id was locked before, clear its button states
   if (prevId && prevId !== id) {
     updateMarkerButtons('drone', prevId);
@@ -1395,25 +1725,49 @@ function unlockMarker(markerType, id) {
     // Update buttons for this id in both drone and pilot sections
     updateMarkerButtons('drone', id);
     updateMarkerButtons('pilot', id);
-    localStorage.setItem('followLock', JSON.stringify(followLock));
+    persist('followLock', followLockString);
   }
 }
 
+// Lock/unlock buttons of open popups keyed by mac, so lock toggles don't go
+// through getElementById. Filled on popupopen and dropped on popupclose.
+const buttonRefs = new Map();
+function popupButtonMac(popup) {
+  const el = popup.getElement();
+  const lockDrone = el && el.querySelector('[id^="lock-drone-"]');
+  return lockDrone ? lockDrone.id.slice('lock-drone-'.length) : null;
+}
+
 function updateMarkerButtons(markerType, id) {
-  var isLocked = (followLock.enabled && followLock.type === markerType && followLock.id === id);
-  var lockBtn = document.getElementById("lock-" + markerType + "-" + id);
-  var unlockBtn = document.getElementById("unlock-" + markerType + "-" + id);
-  if(lockBtn) { lockBtn.style.backgroundColor = isLocked ? "green" : ""; lockBtn.textContent = isLocked ? "Locked on " + markerType.charAt(0).toUpperCase() + markerType.slice(1) : "Lock on " + markerType.charAt(0).toUpperCase() + markerType.slice(1); }
-  if(unlockBtn) { unlockBtn.style.backgroundColor = isLocked ? "" : "green"; unlockBtn.textContent = isLocked ? "Unlock " + markerType.charAt(0).toUpperCase() + markerType.slice(1) : "Unlocked " + markerType.charAt(0).toUpperCase() + markerType.slice(1); }
+  const label = markerType.charAt(0).toUpperCase() + markerType.slice(1);
+  let lockBtn, unlockBtn;
+  domBatch.add(0, () => {
+    const refs = buttonRefs.get(id);
+    if (refs && refs['lock' + label] && refs['lock' + label].isConnected) {
+      lockBtn = refs['lock' + label];
+      unlockBtn = refs['unlock' + label];
+    } else {
+      lockBtn = document.getElementById("lock-" + markerType + "-" + id);
+      unlockBtn = document.getElementById("unlock-" + markerType + "-" + id);
+    }
+  });
+  domBatch.add(1, () => {
+    // Evaluated at flush time so the latest lock state wins
+    var isLocked = (followLock.enabled && followLock.type === markerType && followLock.id === id);
+    if(lockBtn) { lockBtn.style.backgroundColor = isLocked ? "green" : ""; lockBtn.textContent = isLocked ? "Locked on " + label : "Lock on " + label; }
+    if(unlockBtn) { unlockBtn.style.backgroundColor = isLocked ? "" : "green"; unlockBtn.textContent = isLocked ? "Unlock " + label : "Unlocked " + label; }
+  });
+  domBatch.schedule();
 }
 
 function openAliasPopup(mac) {
   let detection = window.tracked_pairs[mac] || {};
   let content = generatePopupContent(Object.assign({mac: mac}, detection), 'alias');
-  if (droneMarkers[mac]) {
-    droneMarkers[mac].setPopupContent(content).openPopup();
-  } else if (pilotMarkers[mac]) {
-    pilotMarkers[mac].setPopupContent(content).openPopup();
+  const marker = droneMarkers[mac] || pilotMarkers[mac];
+  if (marker) {
+    marker.setPopupContent(content).openPopup();
+    // Back to the regular, lazily built popup once the alias view closes
+    marker.once('popupclose', () => marker.setPopupContent(detectionPopupContent));
   } else {
     L.popup({className: 'leaflet-popup-content-wrapper'})
       .setLatLng(map.getCenter())
@@ -1432,28 +1786,32 @@ async function saveAlias(mac) {
       // Immediately update local alias map so popup content uses new alias
       aliases[mac] = alias;
       updateAliases();
-      let detection = window.tracked_pairs[mac] || {mac: mac};
-      let content = generatePopupContent(detection, 'alias');
-      let currentPopup = map.getPopup();
-      if (currentPopup) {
-         currentPopup.setContent(content);
-      } else {
-         L.popup().setContent(content).openOn(map);
-      }
-      // Immediately update the drone list aliases
-      updateComboList(window.tracked_pairs);
-      // Flash the updated alias in the popup
-      const aliasSpan = document.getElementById('aliasDisplay_' + mac);
-      if (aliasSpan) {
-        aliasSpan.textContent = alias;
-        // Force reflow to apply immediate flash
-        aliasSpan.getBoundingClientRect();
-        const prevBg = aliasSpan.style.backgroundColor;
-        aliasSpan.style.backgroundColor = 'purple';
-        setTimeout(() => { aliasSpan.style.backgroundColor = prevBg; }, 300);
-      }
-      // Ensure the alias list updates immediately
-      updateComboList(window.tracked_pairs);
+      let aliasSpan, aliasInput;
+      domBatch.add(0, () => {
+        aliasSpan = document.getElementById('aliasDisplay_' + mac);
+        aliasInput = document.getElementById('aliasInput');
+      });
+      domBatch.add(1, () => {
+        if (aliasSpan) {
+          // Patch the open popup in place rather than re-rendering it
+          aliasSpan.textContent = alias || "No Alias";
+          if (aliasInput) { aliasInput.value = alias; }
+        } else {
+          // Popup was closed meanwhile: reopen it with fresh content
+          let detection = window.tracked_pairs[mac] || {mac: mac};
+          L.popup().setContent(generatePopupContent(detection, 'alias')).openOn(map);
+          aliasSpan = document.getElementById('aliasDisplay_' + mac);
+          if (!aliasSpan) return;
+        }
+        // Flash the updated alias in the popup
+        aliasSpan.classList.remove('alias-flash');
+        void aliasSpan.offsetWidth;
+        aliasSpan.classList.add('alias-flash');
+      });
+      domBatch.schedule();
+      // Immediately update the drone list label; updateAliases() above
+      // re-syncs the whole list once the server's alias map arrives.
+      if (comboListItems[mac]) { comboListItems[mac].textContent = alias || mac; }
     }
   } catch (error) { console.error("Error saving alias:", error); }
 }
@@ -1529,6 +1887,8 @@ const openTopoMap = L.tileLayer('https://{s}.tile.opentopomap.org/{z}/{x}/{y}.pn
     case 'openTopoMap': initialLayer = openTopoMap; break;
     default: initialLayer = esriWorldImagery;
   }
+  // The basemap on the map right now, so a switch never has to search for it
+  let currentBasemap = initialLayer;
 
 const map = L.map('map', {
   center: persistedCenter || [0, 0],
@@ -1547,39 +1907,170 @@ map.createPane('droneCirclePane');
 map.getPane('droneCirclePane').style.zIndex = 650;
 map.createPane('droneIconPane');
 map.getPane('droneIconPane').style.zIndex = 651;
+// Sizes derived from the zoom level, computed once per zoom instead of per
+// marker; zoomend drops them so the next caller recomputes.
+let currentZoomSizes = null;
+function zoomSizes() {
+  if (!currentZoomSizes) {
+    // Clamp between 12px and 24px; icons are boosted a further 15%
+    const base = Math.max(12, Math.min(map.getZoom() * 1.5, 24));
+    currentZoomSizes = { dynamic: base * 1.15, droneRadius: base * 0.45, pilotRadius: base * 0.34 };
+  }
+  return currentZoomSizes;
+}
+map.on('zoomend', function() { currentZoomSizes = null; });
+
+// Shared canvas renderers: every circle and path in a pane is drawn on one
+// <canvas> instead of one SVG node each. The extra padding lets the map pan
+// further before the canvas has to be redrawn.
+const pathRenderer = L.canvas({ padding: 0.5 });
+const droneCircleRenderer = L.canvas({ padding: 0.5, pane: 'droneCirclePane' });
+const pilotCircleRenderer = L.canvas({ padding: 0.5, pane: 'pilotCirclePane' });
+
+// Detection popups are bound to a content function, so Leaflet only builds
+// their HTML when one opens; updates just record the latest detection.
+function detectionPopupContent(marker) {
+  return generatePopupContent(marker._popupDetection, marker._popupType);
+}
+function setPopupDetection(marker, det, type) {
+  marker._popupDetection = det;
+  marker._popupType = type;
+}
 
+map.on('popupopen', function(e) {
+  const mac = popupButtonMac(e.popup);
+  if (!mac) return;
+  const el = e.popup.getElement();
+  const find = (id) => el.querySelector('[id="' + id + '"]');
+  buttonRefs.set(mac, {
+    lockDrone: find('lock-drone-' + mac), unlockDrone: find('unlock-drone-' + mac),
+    lockPilot: find('lock-pilot-' + mac), unlockPilot: find('unlock-pilot-' + mac)
+  });
+  // Popups of unchanged detections are not re-rendered every poll, so bring
+  // the lock buttons and alias up to date when one is shown.
+  updateMarkerButtons('drone', mac);
+  updateMarkerButtons('pilot', mac);
+  const aliasSpan = find('aliasDisplay_' + mac);
+  if (aliasSpan) { aliasSpan.textContent = aliases[mac] ? aliases[mac] : "No Alias"; }
+});
+map.on('popupclose', function(e) {
+  const mac = popupButtonMac(e.popup);
+  if (mac) buttonRefs.delete(mac);
+});
+
+// Popup controls carry data-action/data-mac attributes and are dispatched
+// from single listeners on the map container instead of inline handlers.
+const popupActions = {
+  'query-faa': (el) => queryFaaAPI(el.dataset.mac, el.dataset.basicId),
+  'save-alias': (el) => saveAlias(el.dataset.mac),
+  'clear-alias': (el) => clearAlias(el.dataset.mac),
+  'lock': (el) => lockMarker(el.dataset.type, el.dataset.mac),
+  'unlock': (el) => unlockMarker(el.dataset.type, el.dataset.mac),
+  'lock-observer': () => lockObserver(),
+  'unlock-observer': () => unlockObserver()
+};
+const mapContainer = map.getContainer();
+mapContainer.addEventListener('click', function(e) {
+  const el = e.target.closest('button[data-action]');
+  if (el && popupActions[el.dataset.action]) { popupActions[el.dataset.action](el); }
+});
+mapContainer.addEventListener('input', function(e) {
+  if (e.target.dataset.action === 'color') { previewColor(e.target.dataset.mac, e.target.value); }
+});
+mapContainer.addEventListener('change', function(e) {
+  const action = e.target.dataset.action;
+  if (action === 'color') { updateColor(e.target.dataset.mac, e.target.value); }
+  else if (action === 'observer-emoji') { updateObserverEmoji(); }
+});
+
+// Detections whose marker update was skipped while off-screen; forgetting
+// their last_update makes the next poll bring them up to date.
+const offscreenMacs = new Set();
+// The view is saved once panning has settled for a second, and only if it moved
+let savedCenter = null, savedZoom = null;
+const saveMapView = debounce(function() {
+  const center = JSON.stringify(map.getCenter());
+  const zoom = String(map.getZoom());
+  if (center === savedCenter && zoom === savedZoom) return;
+  savedCenter = center;
+  savedZoom = zoom;
+  persist('mapCenter', () => center);
+  persist('mapZoom', () => zoom);
+  prefetchTiles();
+}, 1000);
+
+// Ask the service worker to warm its tile cache with a small ring of
+// low-zoom base tiles around the view, so a reload paints from disk. URLs are
+// built here because only the page knows the active basemap's template.
+const PREFETCH_ZOOMS = [4, 5];
+function prefetchTiles() {
+  const worker = navigator.serviceWorker && navigator.serviceWorker.controller;
+  if (!worker) return;
+  const layer = currentBasemap;
+  const urls = [];
+  PREFETCH_ZOOMS.forEach(z => {
+    if (z > layer.options.maxZoom) return;
+    const size = (1 << z);
+    const center = map.project(map.getCenter(), z).divideBy(layer.getTileSize().x).floor();
+    for (let dx = -1; dx <= 1; dx++) {
+      for (let dy = -1; dy <= 1; dy++) {
+        const y = center.y + dy;
+        if (y < 0 || y >= size) continue;
+        // Wrap x across the antimeridian the way Leaflet does
+        const coords = L.point(((center.x + dx) % size + size) % size, y);
+        coords.z = z;
+        urls.push(L.Util.template(layer._url, L.extend({
+          r: layer.options.detectRetina && L.Browser.retina && layer.options.maxZoom > 0 ? '@2x' : '',
+          s: layer._getSubdomain(coords),
+          x: coords.x,
+          y: coords.y,
+          z: z
+        }, layer.options)));
+      }
+    }
+  });
+  worker.postMessage({ type: 'prefetch', urls: urls });
+}
+if (navigator.serviceWorker) {
+  navigator.serviceWorker.ready.then(prefetchTiles);
+  // On a first visit the worker only takes control after clients.claim()
+  navigator.serviceWorker.addEventListener('controllerchange', prefetchTiles);
+}
 map.on('moveend', function() {
-  let center = map.getCenter();
-  let zoom = map.getZoom();
-  localStorage.setItem('mapCenter', JSON.stringify(center));
-  localStorage.setItem('mapZoom', zoom);
+  if (offscreenMacs.size) {
+    offscreenMacs.forEach(mac => lastSeenUpdate.delete(mac));
+    offscreenMacs.clear();
+    pollDetectionsNow();
+  }
+  saveMapView();
 });
 
-// Update marker icon sizes whenever the map zoom changes
-map.on('zoomend', function() {
+// Update marker icon sizes whenever the map zoom changes. Zoom animations can
+// fire zoomend in bursts, so the marker walk runs at most once per frame.
+map.on('zoomend', rafThrottle(function() {
   // Scale circle and ring radii based on current zoom
-  const zoomLevel = map.getZoom();
-  const size = Math.max(12, Math.min(zoomLevel * 1.5, 24));
-  const circleRadius = size * 0.45;
-  Object.keys(droneMarkers).forEach(mac => {
-    const color = get_color_for_mac(mac);
-    droneMarkers[mac].setIcon(createIcon('🛸', color));
-  });
-  Object.keys(pilotMarkers).forEach(mac => {
-    const color = get_color_for_mac(mac);
-    pilotMarkers[mac].setIcon(createIcon('👤', color));
-  });
-  // Update circle marker sizes
-  Object.values(droneCircles).forEach(circle => circle.setRadius(circleRadius));
-  Object.values(pilotCircles).forEach(circle => circle.setRadius(circleRadius));
-  // Update broadcast ring sizes
-  Object.values(droneBroadcastRings).forEach(ring => ring.setRadius(size * 0.34));
+  const sizes = zoomSizes();
+  const circleRadius = sizes.droneRadius;
+  const ringRadius = sizes.pilotRadius;
+  // Icons are cached, so markers whose size didn't change keep their element
+  for (const mac in droneMarkers) {
+    const icon = createIcon('🛸', get_color_for_mac(mac));
+    if (droneMarkers[mac].options.icon !== icon) { droneMarkers[mac].setIcon(icon); }
+    if (droneCircles[mac]) { droneCircles[mac].setRadius(circleRadius); }
+    if (droneBroadcastRings[mac]) { droneBroadcastRings[mac].setRadius(ringRadius); }
+  }
+  for (const mac in pilotMarkers) {
+    const icon = createIcon('👤', get_color_for_mac(mac));
+    if (pilotMarkers[mac].options.icon !== icon) { pilotMarkers[mac].setIcon(icon); }
+    if (pilotCircles[mac]) { pilotCircles[mac].setRadius(circleRadius); }
+  }
   // Update observer icon size based on zoom level
   if (observerMarker) {
     const storedObserverEmoji = localStorage.getItem('observerEmoji') || "😎";
-    observerMarker.setIcon(createIcon(storedObserverEmoji, 'blue'));
+    const observerIcon = createIcon(storedObserverEmoji, 'blue');
+    if (observerMarker.options.icon !== observerIcon) { observerMarker.setIcon(observerIcon); }
   }
-});
+}));
 
 document.getElementById("layerSelect").addEventListener("change", function() {
   let value = this.value;
@@ -1592,11 +2083,12 @@ document.getElementById("layerSelect").addEventListener("change", function() {
   else if (value === "esriWorldTopo") newLayer = esriWorldTopo;
   else if (value === "esriDarkGray") newLayer = esriDarkGray;
   else if (value === "openTopoMap") newLayer = openTopoMap;
-  map.eachLayer(function(layer) {
-    if (layer.options && layer.options.attribution) { map.removeLayer(layer); }
-  });
-  newLayer.addTo(map);
-  newLayer.redraw();
+  if (newLayer !== currentBasemap) {
+    map.removeLayer(currentBasemap);
+    currentBasemap = newLayer;
+    newLayer.addTo(map);
+    prefetchTiles();
+  }
   // Clamp zoom to the layer's allowed maxZoom to avoid missing tiles
   const maxAllowed = newLayer.options.maxZoom;
   if (map.getZoom() > maxAllowed) {
@@ -1610,7 +2102,8 @@ document.getElementById("layerSelect").addEventListener("change", function() {
   setTimeout(() => { this.style.backgroundColor = "rgba(0,0,0,0.8)"; this.style.color = "lime"; }, 500);
 });
 
-let persistentMACs = [];
+// Every mac seen this session, in first-seen order (a Set keeps that order)
+const persistentMACs = new Set();
 const droneMarkers = {};
 const pilotMarkers = {};
 const droneCircles = {};
@@ -1650,6 +2143,90 @@ function zoomToDrone(mac, detection) {
   }
 }
 
+// Each path keeps at most MAX_PATH_POINTS points. Once PATH_TRIM_SLACK more
+// have piled up the oldest are dropped in one go, so the polyline is reset
+// once per PATH_TRIM_SLACK points rather than on every point.
+const MAX_PATH_POINTS = 2048;
+const PATH_TRIM_SLACK = 256;
+// The newest point may replace the path's tail only while every sample merged
+// into that tail stays within this distance of the straightened segment.
+// Fixed in metres so the stored path doesn't depend on the zoom level.
+const PATH_COLLINEAR_TOLERANCE_M = 3;
+// Cap on samples merged into one tail, so each check stays cheap
+const PATH_MERGE_MAX = 64;
+// Raw samples merged into each path's current tail, keyed by its coords array;
+// a path swapped in by replacePath starts with a fresh array and no merges.
+const pathMerged = new WeakMap();
+
+// Distance from point p to segment a-b, in metres (local flat-earth
+// projection around a, which is plenty accurate over a few hundred metres)
+function segmentDistance(p, a, b) {
+  const mPerDeg = Math.PI * 6371008.8 / 180;
+  const kx = mPerDeg * Math.cos(a[0] * Math.PI / 180);
+  const dx = (b[1] - a[1]) * kx, dy = (b[0] - a[0]) * mPerDeg;
+  const px = (p[1] - a[1]) * kx, py = (p[0] - a[0]) * mPerDeg;
+  const len2 = dx * dx + dy * dy;
+  let t = len2 ? (px * dx + py * dy) / len2 : 0;
+  t = Math.max(0, Math.min(1, t));
+  const ex = t * dx - px, ey = t * dy - py;
+  return Math.sqrt(ex * ex + ey * ey);
+}
+
+// Paths are extended in place with addLatLng; a polyline is only created the
+// first time a mac gets a point and is otherwise never torn down and rebuilt.
+function extendPath(coordsByMac, polylines, mac, lat, lng, style) {
+  if (!coordsByMac[mac]) { coordsByMac[mac] = []; }
+  const coords = coordsByMac[mac];
+  const n = coords.length;
+  const last = coords[n - 1];
+  if (last && last[0] == lat && last[1] == lng) return;
+  const point = [lat, lng];
+  const polyline = polylines[mac];
+  // Douglas-Peucker over the samples since the anchor (the point before the
+  // tail): the new point replaces the tail only if the tail and every sample
+  // already merged into it lie within tolerance of the anchor-to-new chord.
+  // Otherwise the tail is kept for good and becomes the next anchor.
+  let merged = pathMerged.get(coords);
+  if (!merged) { merged = []; pathMerged.set(coords, merged); }
+  const anchor = coords[n - 2];
+  const canMerge = n >= 2 && merged.length < PATH_MERGE_MAX &&
+    segmentDistance(last, anchor, point) < PATH_COLLINEAR_TOLERANCE_M &&
+    merged.every(p => segmentDistance(p, anchor, point) < PATH_COLLINEAR_TOLERANCE_M);
+  if (canMerge) {
+    merged.push(last);
+    coords[n - 1] = point;
+    if (polyline) {
+      const latlngs = polyline.getLatLngs();
+      latlngs[latlngs.length - 1] = L.latLng(point);
+      polyline.redraw();
+    }
+    return;
+  }
+  merged.length = 0;
+  coords.push(point);
+  if (coords.length > MAX_PATH_POINTS + PATH_TRIM_SLACK) {
+    coords.splice(0, coords.length - MAX_PATH_POINTS);
+    if (polyline) { polyline.setLatLngs(coords); return; }
+  }
+  if (polyline) { polyline.addLatLng(point); }
+  else { polylines[mac] = L.polyline(coords, Object.assign({renderer: pathRenderer}, style)).addTo(map); }
+}
+
+// Swap in a full server-side path, skipping setLatLngs when nothing changed
+function replacePath(coordsByMac, polylines, mac, coords, style) {
+  if (coords.length > MAX_PATH_POINTS) { coords = coords.slice(-MAX_PATH_POINTS); }
+  const prev = coordsByMac[mac];
+  coordsByMac[mac] = coords;
+  if (polylines[mac]) {
+    const last = coords[coords.length - 1], prevLast = prev && prev[prev.length - 1];
+    const unchanged = prev && prev.length === coords.length &&
+      (!last || (prevLast && prevLast[0] == last[0] && prevLast[1] == last[1]));
+    if (!unchanged) { polylines[mac].setLatLngs(coords); }
+  } else {
+    polylines[mac] = L.polyline(coords, Object.assign({renderer: pathRenderer}, style)).addTo(map);
+  }
+}
+
 function showHistoricalDrone(mac, detection) {
   const color = get_color_for_mac(mac);
   if (!droneMarkers[mac]) {
@@ -1657,51 +2234,45 @@ function showHistoricalDrone(mac, detection) {
       icon: createIcon('🛸', color),
       pane: 'droneIconPane'
     })
-                           .bindPopup(generatePopupContent(detection, 'drone'))
+                           .bindPopup(detectionPopupContent)
                            .addTo(map)
                            .on('click', function(){ map.setView(this.getLatLng(), map.getZoom()); });
   } else {
     droneMarkers[mac].setLatLng([detection.drone_lat, detection.drone_long]);
-    droneMarkers[mac].setPopupContent(generatePopupContent(detection, 'drone'));
   }
+  setPopupDetection(droneMarkers[mac], detection, 'drone');
   if (!droneCircles[mac]) {
-    const zoomLevel = map.getZoom();
-    const size = Math.max(12, Math.min(zoomLevel * 1.5, 24));
     droneCircles[mac] = L.circleMarker([detection.drone_lat, detection.drone_long],
                                        {
                                          pane: 'droneCirclePane',
-                                         radius: size * 0.45,
+                                         renderer: droneCircleRenderer,
+                                         radius: zoomSizes().droneRadius,
                                          color: color,
                                          fillColor: color,
                                          fillOpacity: 0.7
                                        })
                            .addTo(map);
   } else { droneCircles[mac].setLatLng([detection.drone_lat, detection.drone_long]); }
-  if (!dronePathCoords[mac]) { dronePathCoords[mac] = []; }
-  const lastDrone = dronePathCoords[mac][dronePathCoords[mac].length - 1];
-  if (!lastDrone || lastDrone[0] != detection.drone_lat || lastDrone[1] != detection.drone_long) { dronePathCoords[mac].push([detection.drone_lat, detection.drone_long]); }
-  if (dronePolylines[mac]) { map.removeLayer(dronePolylines[mac]); }
-  dronePolylines[mac] = L.polyline(dronePathCoords[mac], {color: color}).addTo(map);
+  extendPath(dronePathCoords, dronePolylines, mac, detection.drone_lat, detection.drone_long, {color: color});
   if (detection.pilot_lat && detection.pilot_long && detection.pilot_lat != 0 && detection.pilot_long != 0) {
     if (!pilotMarkers[mac]) {
       pilotMarkers[mac] = L.marker([detection.pilot_lat, detection.pilot_long], {
         icon: createIcon('👤', color),
         pane: 'pilotIconPane'
       })
-                             .bindPopup(generatePopupContent(detection, 'pilot'))
+                             .bindPopup(detectionPopupContent)
                              .addTo(map)
                              .on('click', function(){ map.setView(this.getLatLng(), map.getZoom()); });
     } else {
       pilotMarkers[mac].setLatLng([detection.pilot_lat, detection.pilot_long]);
-      pilotMarkers[mac].setPopupContent(generatePopupContent(detection, 'pilot'));
     }
+    setPopupDetection(pilotMarkers[mac], detection, 'pilot');
     if (!pilotCircles[mac]) {
-      const zoomLevel = map.getZoom();
-      const size = Math.max(12, Math.min(zoomLevel * 1.5, 24));
       pilotCircles[mac] = L.circleMarker([detection.pilot_lat, detection.pilot_long],
                                           {
                                             pane: 'pilotCirclePane',
-                                            radius: size * 0.34,
+                                            renderer: pilotCircleRenderer,
+                                            radius: zoomSizes().pilotRadius,
                                             color: color,
                                             fillColor: color,
                                             fillOpacity: 0.7
@@ -1709,33 +2280,79 @@ function showHistoricalDrone(mac, detection) {
                             .addTo(map);
     } else { pilotCircles[mac].setLatLng([detection.pilot_lat, detection.pilot_long]); }
     // Historical pilot path (dotted)
-    if (!pilotPathCoords[mac]) { pilotPathCoords[mac] = []; }
-    const lastPilotHis = pilotPathCoords[mac][pilotPathCoords[mac].length - 1];
-    if (!lastPilotHis || lastPilotHis[0] !== detection.pilot_lat || lastPilotHis[1] !== detection.pilot_long) {
-      pilotPathCoords[mac].push([detection.pilot_lat, detection.pilot_long]);
-    }
-    if (pilotPolylines[mac]) { map.removeLayer(pilotPolylines[mac]); }
-    pilotPolylines[mac] = L.polyline(pilotPathCoords[mac], { color: color, dashArray: '5,5' }).addTo(map);
+    extendPath(pilotPathCoords, pilotPolylines, mac, detection.pilot_lat, detection.pilot_long, {color: color, dashArray: '5,5'});
   }
 }
 
-function colorFromMac(mac) {
+// Default hue per mac, hashed once and cached
+const hueCache = Object.create(null);
+function hueFor(mac) {
+  let h = hueCache[mac];
+  if (h !== undefined) return h;
   let hash = 0;
   for (let i = 0; i < mac.length; i++) { hash = mac.charCodeAt(i) + ((hash << 5) - hash); }
-  let h = Math.abs(hash) % 360;
-  return 'hsl(' + h + ', 70%, 50%)';
+  h = Math.abs(hash) % 360;
+  hueCache[mac] = h;
+  return h;
+}
+
+function colorFromMac(mac) {
+  return 'hsl(' + hueFor(mac) + ', 70%, 50%)';
 }
 
+// Finished HSL strings: default colours keyed by mac, overrides by "o:"+hue,
+// so a changed override simply lands on a different key.
+const colorCache = new Map();
 function get_color_for_mac(mac) {
-  if (colorOverrides.hasOwnProperty(mac)) { return "hsl(" + colorOverrides[mac] + ", 70%, 50%)"; }
-  return colorFromMac(mac);
+  const key = colorOverrides.hasOwnProperty(mac) ? "o:" + colorOverrides[mac] : mac;
+  let color = colorCache.get(key);
+  if (color === undefined) {
+    color = key === mac ? colorFromMac(mac) : "hsl(" + colorOverrides[mac] + ", 70%, 50%)";
+    colorCache.set(key, color);
+  }
+  return color;
 }
 
+// Double-clicking a list item pins/unpins the drone as a historical track
+function toggleHistoricalDrone(mac) {
+  const item = comboListItems[mac];
+  const detection = window.tracked_pairs && window.tracked_pairs[mac];
+  restorePaths();
+  if (historicalDrones[mac]) {
+    delete historicalDrones[mac];
+    persist('historicalDrones', () => packHistoricalDrones(historicalDrones));
+    if (droneMarkers[mac]) { map.removeLayer(droneMarkers[mac]); delete droneMarkers[mac]; }
+    if (pilotMarkers[mac]) { map.removeLayer(pilotMarkers[mac]); delete pilotMarkers[mac]; }
+    lastColor.delete(mac);
+    item.classList.remove("selected");
+    map.closePopup();
+  } else {
+    historicalDrones[mac] = Object.assign({}, detection, { userLocked: true, lockTime: Date.now()/1000 });
+    persist('historicalDrones', () => packHistoricalDrones(historicalDrones));
+    showHistoricalDrone(mac, historicalDrones[mac]);
+    item.classList.add("selected");
+    openAliasPopup(mac);
+    if (detection && detection.drone_lat && detection.drone_long && detection.drone_lat != 0 && detection.drone_long != 0) {
+      safeSetView([detection.drone_lat, detection.drone_long], 18);
+    }
+  }
+}
+// One listener per list instead of one closure per item
+["activePlaceholder", "inactivePlaceholder"].forEach(id => {
+  document.getElementById(id).addEventListener("dblclick", e => {
+    const item = e.target.closest(".drone-item");
+    if (item) toggleHistoricalDrone(item.dataset.mac);
+  });
+});
+
 function updateComboList(data) {
   const activePlaceholder = document.getElementById("activePlaceholder");
   const inactivePlaceholder = document.getElementById("inactivePlaceholder");
   const currentTime = Date.now() / 1000;
-  
+  // Items that change sides are collected off-DOM and attached in one go
+  const activeFrag = document.createDocumentFragment();
+  const inactiveFrag = document.createDocumentFragment();
+
   persistentMACs.forEach(mac => {
     let detection = data[mac];
     let isActive = detection && ((currentTime - detection.last_update) <= STALE_THRESHOLD);
@@ -1744,67 +2361,157 @@ function updateComboList(data) {
       item = document.createElement("div");
       comboListItems[mac] = item;
       item.className = "drone-item";
-      item.addEventListener("dblclick", () => {
-         restorePaths();
-         if (historicalDrones[mac]) {
-             delete historicalDrones[mac];
-             localStorage.setItem('historicalDrones', JSON.stringify(historicalDrones));
-             if (droneMarkers[mac]) { map.removeLayer(droneMarkers[mac]); delete droneMarkers[mac]; }
-             if (pilotMarkers[mac]) { map.removeLayer(pilotMarkers[mac]); delete pilotMarkers[mac]; }
-             item.classList.remove("selected");
-             map.closePopup();
-         } else {
-             historicalDrones[mac] = Object.assign({}, detection, { userLocked: true, lockTime: Date.now()/1000 });
-             localStorage.setItem('historicalDrones', JSON.stringify(historicalDrones));
-             showHistoricalDrone(mac, historicalDrones[mac]);
-             item.classList.add("selected");
-             openAliasPopup(mac);
-             if (detection && detection.drone_lat && detection.drone_long && detection.drone_lat != 0 && detection.drone_long != 0) {
-                 safeSetView([detection.drone_lat, detection.drone_long], 18);
-             }
-         }
-      });
+      item.dataset.mac = mac;
     }
     item.textContent = aliases[mac] ? aliases[mac] : mac;
     const color = get_color_for_mac(mac);
     item.style.borderColor = color;
     item.style.color = color;
     if (isActive) {
-      if (item.parentNode !== activePlaceholder) { activePlaceholder.appendChild(item); }
+      if (item.parentNode !== activePlaceholder) { activeFrag.appendChild(item); }
     } else {
-      if (item.parentNode !== inactivePlaceholder) { inactivePlaceholder.appendChild(item); }
+      if (item.parentNode !== inactivePlaceholder) { inactiveFrag.appendChild(item); }
     }
   });
+  if (activeFrag.firstChild) { activePlaceholder.appendChild(activeFrag); }
+  if (inactiveFrag.firstChild) { inactivePlaceholder.appendChild(inactiveFrag); }
+}
+
+// All periodic work shares one scheduler instead of separate setIntervals:
+// a single timer sleeps until the earliest task is due, then a
+// requestAnimationFrame runs every due task in the same frame. Nothing wakes
+// the page between due times, and the tasks stop while the tab is hidden
+// because rAF does. Each task keeps its own period.
+const scheduledTasks = new Set();
+let schedulerTimer = null;
+let schedulerFrameRequested = false;
+function scheduleTask(fn, periodMs) {
+  const task = { fn: fn, periodMs: periodMs, nextDue: performance.now() + periodMs };
+  scheduledTasks.add(task);
+  wakeScheduler();
+  return task;
+}
+function cancelTask(task) { scheduledTasks.delete(task); wakeScheduler(); }
+// Pull a task forward so it runs on the next frame
+function runTaskSoon(task) {
+  task.nextDue = performance.now();
+  wakeScheduler();
+}
+// (Re)arm the timer for the earliest nextDue; a pending frame re-arms it itself
+function wakeScheduler() {
+  if (schedulerFrameRequested) return;
+  clearTimeout(schedulerTimer);
+  schedulerTimer = null;
+  let earliest = Infinity;
+  scheduledTasks.forEach(task => { if (task.nextDue < earliest) earliest = task.nextDue; });
+  if (earliest === Infinity) return;
+  schedulerTimer = setTimeout(() => {
+    schedulerTimer = null;
+    schedulerFrameRequested = true;
+    requestAnimationFrame(runScheduledTasks);
+  }, Math.max(0, earliest - performance.now()));
+}
+function runScheduledTasks(ts) {
+  schedulerFrameRequested = false;
+  scheduledTasks.forEach(task => {
+    if (ts < task.nextDue) return;
+    task.nextDue += task.periodMs;
+    // After a hidden stretch, carry on from now rather than catching up
+    if (task.nextDue <= ts) task.nextDue = ts + task.periodMs;
+    task.fn(ts);
+  });
+  wakeScheduler();
+}
+
+// Detection polling runs as a scheduler task every updateDataPeriod: a slow
+// response simply delays the next poll instead of stacking up.
+// A request that has not answered within UPDATE_DATA_STALL_MS is aborted and
+// replaced by a fresh one, so a hung connection cannot stall the map.
+let updateDataPeriod = 200;
+let updateDataTask = null;
+const UPDATE_DATA_STALL_MS = 5000;
+let lastUpdateDataTime = -Infinity;
+let updateDataPending = null;
+let updateDataController = null;
+const lastSeenUpdate = new Map();
+// Monotonic request ids: responses older than the last applied one are dropped
+let detReqId = 0, detLastApplied = 0;
+function updateDataLoop(ts) {
+  if (!updateDataPending || ts - lastUpdateDataTime >= UPDATE_DATA_STALL_MS) {
+    lastUpdateDataTime = ts;
+    const pending = updateData();
+    updateDataPending = pending;
+    pending.finally(() => { if (updateDataPending === pending) updateDataPending = null; });
+  }
+}
+
+// Poll on the next frame, replacing any request still in flight
+function pollDetectionsNow() {
+  lastUpdateDataTime = -Infinity;
+  if (updateDataTask) { runTaskSoon(updateDataTask); }
+}
+function setUpdateDataPeriod(periodMs) {
+  updateDataPeriod = periodMs;
+  if (!updateDataTask) return;
+  updateDataTask.periodMs = periodMs;
+  updateDataTask.nextDue = Math.min(updateDataTask.nextDue, performance.now() + periodMs);
+  wakeScheduler();
 }
 
 async function updateData() {
+  // A new poll supersedes any request still in flight
+  if (updateDataController) updateDataController.abort();
+  const controller = new AbortController();
+  updateDataController = controller;
   try {
-    const response = await fetch('/api/detections');
+    const reqId = ++detReqId;
+    const response = await fetch('/api/detections', {signal: controller.signal});
     const data = await response.json();
+    // Never let an older response overwrite state from a newer one
+    if (reqId <= detLastApplied) return;
+    detLastApplied = reqId;
     window.tracked_pairs = data;
-    // Persist current detection data to localStorage so that markers & paths remain on reload.
-    localStorage.setItem("trackedPairs", JSON.stringify(data));
     const currentTime = Date.now() / 1000;
-    for (const mac in data) { if (!persistentMACs.includes(mac)) { persistentMACs.push(mac); } }
+    // Only macs whose last_update moved since the previous poll need their
+    // markers, paths and popups touched.
+    const changedMacs = new Set();
+    const viewBounds = map.getBounds().pad(0.2);
+    for (const mac in data) {
+      persistentMACs.add(mac);
+      // The server sends each mac's default colour; use it instead of hashing here
+      if (data[mac].color && !colorCache.has(mac)) { colorCache.set(mac, data[mac].color); }
+      if (lastSeenUpdate.get(mac) !== data[mac].last_update) {
+        lastSeenUpdate.set(mac, data[mac].last_update);
+        changedMacs.add(mac);
+      }
+    }
+    // Persist changed detections so that markers & paths remain on reload,
+    // and save again when the mac count shrinks so dropped macs are pruned.
+    const macCount = Object.keys(data).length;
+    if (changedMacs.size || macCount !== savedMacCount) {
+      savedMacCount = macCount;
+      saveTrackedPairs(data, changedMacs);
+    }
     for (const mac in data) {
       if (historicalDrones[mac]) {
         if (data[mac].last_update > historicalDrones[mac].lockTime || (currentTime - historicalDrones[mac].lockTime) > STALE_THRESHOLD) {
           delete historicalDrones[mac];
-          localStorage.setItem('historicalDrones', JSON.stringify(historicalDrones));
-          if (droneBroadcastRings[mac]) { map.removeLayer(droneBroadcastRings[mac]); delete droneBroadcastRings[mac]; }
+          persist('historicalDrones', () => packHistoricalDrones(historicalDrones));
+          scheduleWrite(() => removeBroadcastRing(mac));
         } else { continue; }
       }
       const det = data[mac];
       if (!det.last_update || (currentTime - det.last_update > STALE_THRESHOLD)) {
-        if (droneMarkers[mac]) { map.removeLayer(droneMarkers[mac]); delete droneMarkers[mac]; }
-        if (pilotMarkers[mac]) { map.removeLayer(pilotMarkers[mac]); delete pilotMarkers[mac]; }
-        if (droneCircles[mac]) { map.removeLayer(droneCircles[mac]); delete droneCircles[mac]; }
-        if (pilotCircles[mac]) { map.removeLayer(pilotCircles[mac]); delete pilotCircles[mac]; }
-        if (dronePolylines[mac]) { map.removeLayer(dronePolylines[mac]); delete dronePolylines[mac]; }
-        if (pilotPolylines[mac]) { map.removeLayer(pilotPolylines[mac]); delete pilotPolylines[mac]; }
-        if (droneBroadcastRings[mac]) { map.removeLayer(droneBroadcastRings[mac]); delete droneBroadcastRings[mac]; }
-        delete dronePathCoords[mac];
-        delete pilotPathCoords[mac];
+        if (droneMarkers[mac] || pilotMarkers[mac] || dronePathCoords[mac] || pilotPathCoords[mac]) {
+          scheduleWrite(() => removeDetectionLayers(mac));
+        }
+        continue;
+      }
+      if (!changedMacs.has(mac) && (droneMarkers[mac] || pilotMarkers[mac])) {
+        // Unchanged: only the time-based broadcast ring can need clearing
+        if (droneBroadcastRings[mac] && currentTime - det.last_update > 5) {
+          scheduleWrite(() => removeBroadcastRing(mac));
+        }
         continue;
       }
       const droneLat = det.drone_lat, droneLng = det.drone_long;
@@ -1812,129 +2519,200 @@ async function updateData() {
       const validDrone = (droneLat !== 0 && droneLng !== 0);
       const validPilot = (pilotLat !== 0 && pilotLng !== 0);
       if (!validDrone && !validPilot) continue;
-      const color = get_color_for_mac(mac);
-      if (!firstDetectionZoomed && validDrone) {
-        firstDetectionZoomed = true;
-        safeSetView([droneLat, droneLng], 18);
+      // Markers that stay outside the padded viewport are left where they are;
+      // moveend re-queues them once the map is panned their way.
+      const followed = followLock.enabled && followLock.id === mac;
+      const droneAway = !validDrone || (droneMarkers[mac] && !viewBounds.contains([droneLat, droneLng]) && !viewBounds.contains(droneMarkers[mac].getLatLng()));
+      const pilotAway = !validPilot || (pilotMarkers[mac] && !viewBounds.contains([pilotLat, pilotLng]) && !viewBounds.contains(pilotMarkers[mac].getLatLng()));
+      if (!followed && droneAway && pilotAway) {
+        offscreenMacs.add(mac);
+        continue;
       }
-      if (validDrone) {
-        if (droneMarkers[mac]) {
-          droneMarkers[mac].setLatLng([droneLat, droneLng]);
-          if (!droneMarkers[mac].isPopupOpen()) { droneMarkers[mac].setPopupContent(generatePopupContent(det, 'drone')); }
-        } else {
-          droneMarkers[mac] = L.marker([droneLat, droneLng], {
-            icon: createIcon('🛸', color),
-            pane: 'droneIconPane'
-          })
-                                .bindPopup(generatePopupContent(det, 'drone'))
-                                .addTo(map)
-                                .on('click', function(){ map.setView(this.getLatLng(), map.getZoom()); });
-        }
-        if (droneCircles[mac]) { droneCircles[mac].setLatLng([droneLat, droneLng]); }
-        else {
-          const zoomLevel = map.getZoom();
-          const size = Math.max(12, Math.min(zoomLevel * 1.5, 24));
-          droneCircles[mac] = L.circleMarker([droneLat, droneLng], {
-            pane: 'droneCirclePane',
-            radius: size * 0.45,
-            color: color,
-            fillColor: color,
-            fillOpacity: 0.7
-          }).addTo(map);
-        }
-        if (!dronePathCoords[mac]) { dronePathCoords[mac] = []; }
-        const lastDrone = dronePathCoords[mac][dronePathCoords[mac].length - 1];
-        if (!lastDrone || lastDrone[0] != droneLat || lastDrone[1] != droneLng) { dronePathCoords[mac].push([droneLat, droneLng]); }
-        if (dronePolylines[mac]) { map.removeLayer(dronePolylines[mac]); }
-        dronePolylines[mac] = L.polyline(dronePathCoords[mac], {color: color}).addTo(map);
-        if (currentTime - det.last_update <= 5) {
-          const dynamicRadius = getDynamicSize() * 0.45;
-          const ringWeight = 3 * 0.8;  // 20% thinner
-          const ringRadius = dynamicRadius + ringWeight / 2;  // sit just outside the main circle
-          if (droneBroadcastRings[mac]) {
-            droneBroadcastRings[mac].setLatLng([droneLat, droneLng]);
-            droneBroadcastRings[mac].setRadius(ringRadius);
-            droneBroadcastRings[mac].setStyle({ weight: ringWeight });
-          } else {
-            droneBroadcastRings[mac] = L.circleMarker([droneLat, droneLng], {
-              pane: 'droneCirclePane',
-              radius: ringRadius,
-              color: "lime",
-              fill: false,
-              weight: ringWeight
-            }).addTo(map);
-          }
-        } else {
-          if (droneBroadcastRings[mac]) {
-            map.removeLayer(droneBroadcastRings[mac]);
-            delete droneBroadcastRings[mac];
-          }
-        }
-        if (followLock.enabled && followLock.type === 'drone' && followLock.id === mac) { map.setView([droneLat, droneLng], map.getZoom()); }
+      scheduleWrite(() => applyDetection(mac, det, currentTime));
+    }
+    scheduleWrite(() => updateComboList(data));
+    updateAliases();
+  } catch (error) {
+    if (error.name !== 'AbortError') { console.error("Error fetching detection data:", error); }
+  } finally {
+    if (updateDataController === controller) updateDataController = null;
+  }
+}
+
+// Frame-batched write queue: updateData decides what changed first, then
+// queues the Leaflet/DOM mutations here so they land together in the next
+// animation frame. Work beyond an 8 ms budget spills into the next frame.
+const writeQueue = [];
+let writeFrame = 0;
+function scheduleWrite(fn) {
+  writeQueue.push(fn);
+  if (!writeFrame) { writeFrame = requestAnimationFrame(flushWrites); }
+}
+function flushWrites() {
+  writeFrame = 0;
+  const start = performance.now();
+  while (writeQueue.length && performance.now() - start < 8) { writeQueue.shift()(); }
+  if (writeQueue.length) { writeFrame = requestAnimationFrame(flushWrites); }
+}
+
+function removeBroadcastRing(mac) {
+  if (droneBroadcastRings[mac]) { map.removeLayer(droneBroadcastRings[mac]); delete droneBroadcastRings[mac]; }
+}
+
+function removeDetectionLayers(mac) {
+  if (droneMarkers[mac]) { map.removeLayer(droneMarkers[mac]); delete droneMarkers[mac]; }
+  if (pilotMarkers[mac]) { map.removeLayer(pilotMarkers[mac]); delete pilotMarkers[mac]; }
+  if (droneCircles[mac]) { map.removeLayer(droneCircles[mac]); delete droneCircles[mac]; }
+  if (pilotCircles[mac]) { map.removeLayer(pilotCircles[mac]); delete pilotCircles[mac]; }
+  if (dronePolylines[mac]) { map.removeLayer(dronePolylines[mac]); delete dronePolylines[mac]; }
+  if (pilotPolylines[mac]) { map.removeLayer(pilotPolylines[mac]); delete pilotPolylines[mac]; }
+  removeBroadcastRing(mac);
+  delete dronePathCoords[mac];
+  delete pilotPathCoords[mac];
+  lastColor.delete(mac);
+}
+
+// A new last_update often comes with the same position; setLatLng would
+// still reposition the icon and redraw the canvas, so skip it then.
+function moveLayer(layer, lat, lng) {
+  const current = layer.getLatLng();
+  if (current.lat !== lat || current.lng !== lng) { layer.setLatLng([lat, lng]); }
+}
+
+// Marker, circle, path and ring writes for one changed detection
+function applyDetection(mac, det, currentTime) {
+  const droneLat = det.drone_lat, droneLng = det.drone_long;
+  const pilotLat = det.pilot_lat, pilotLng = det.pilot_long;
+  const validDrone = (droneLat !== 0 && droneLng !== 0);
+  const validPilot = (pilotLat !== 0 && pilotLng !== 0);
+  const color = get_color_for_mac(mac);
+  if (!firstDetectionZoomed && validDrone) {
+    firstDetectionZoomed = true;
+    safeSetView([droneLat, droneLng], 18);
+  }
+  if (validDrone) {
+    if (droneMarkers[mac]) {
+      moveLayer(droneMarkers[mac], droneLat, droneLng);
+    } else {
+      droneMarkers[mac] = L.marker([droneLat, droneLng], {
+        icon: createIcon('🛸', color),
+        pane: 'droneIconPane'
+      })
+                            .bindPopup(detectionPopupContent)
+                            .addTo(map)
+                            .on('click', function(){ map.setView(this.getLatLng(), map.getZoom()); });
+    }
+    setPopupDetection(droneMarkers[mac], det, 'drone');
+    if (droneCircles[mac]) { moveLayer(droneCircles[mac], droneLat, droneLng); }
+    else {
+      droneCircles[mac] = L.circleMarker([droneLat, droneLng], {
+        pane: 'droneCirclePane',
+        renderer: droneCircleRenderer,
+        radius: zoomSizes().droneRadius,
+        color: color,
+        fillColor: color,
+        fillOpacity: 0.7
+      }).addTo(map);
+    }
+    extendPath(dronePathCoords, dronePolylines, mac, droneLat, droneLng, {color: color});
+    if (currentTime - det.last_update <= 5) {
+      const dynamicRadius = zoomSizes().dynamic * 0.45;
+      const ringWeight = 3 * 0.8;  // 20% thinner
+      const ringRadius = dynamicRadius + ringWeight / 2;  // sit just outside the main circle
+      if (droneBroadcastRings[mac]) {
+        const ring = droneBroadcastRings[mac];
+        moveLayer(ring, droneLat, droneLng);
+        if (ring.getRadius() !== ringRadius) { ring.setRadius(ringRadius); }
+        if (ring.options.weight !== ringWeight) { ring.setStyle({ weight: ringWeight }); }
+      } else {
+        droneBroadcastRings[mac] = L.circleMarker([droneLat, droneLng], {
+          pane: 'droneCirclePane',
+          renderer: droneCircleRenderer,
+          radius: ringRadius,
+          color: "lime",
+          fill: false,
+          weight: ringWeight
+        }).addTo(map);
       }
-      if (validPilot) {
-        if (pilotMarkers[mac]) {
-          pilotMarkers[mac].setLatLng([pilotLat, pilotLng]);
-          if (!pilotMarkers[mac].isPopupOpen()) { pilotMarkers[mac].setPopupContent(generatePopupContent(det, 'pilot')); }
-        } else {
-          pilotMarkers[mac] = L.marker([pilotLat, pilotLng], {
-            icon: createIcon('👤', color),
-            pane: 'pilotIconPane'
-          })
-                                .bindPopup(generatePopupContent(det, 'pilot'))
-                                .addTo(map)
-                                .on('click', function(){ map.setView(this.getLatLng(), map.getZoom()); });
-        }
-        if (pilotCircles[mac]) { pilotCircles[mac].setLatLng([pilotLat, pilotLng]); }
-        else {
-          const zoomLevel = map.getZoom();
-          const size = Math.max(12, Math.min(zoomLevel * 1.5, 24));
-          pilotCircles[mac] = L.circleMarker([pilotLat, pilotLng], {
-            pane: 'pilotCirclePane',
-            radius: size * 0.34,
-            color: color,
-            fillColor: color,
-            fillOpacity: 0.7
-          }).addTo(map);
-        }
-        if (!pilotPathCoords[mac]) { pilotPathCoords[mac] = []; }
-        const lastPilot = pilotPathCoords[mac][pilotPathCoords[mac].length - 1];
-        if (!lastPilot || lastPilot[0] != pilotLat || lastPilot[1] != pilotLng) { pilotPathCoords[mac].push([pilotLat, pilotLng]); }
-        if (pilotPolylines[mac]) { map.removeLayer(pilotPolylines[mac]); }
-        pilotPolylines[mac] = L.polyline(pilotPathCoords[mac], {color: color, dashArray: '5,5'}).addTo(map);
-        if (followLock.enabled && followLock.type === 'pilot' && followLock.id === mac) { map.setView([pilotLat, pilotLng], map.getZoom()); }
+    } else {
+      if (droneBroadcastRings[mac]) {
+        map.removeLayer(droneBroadcastRings[mac]);
+        delete droneBroadcastRings[mac];
       }
     }
-    updateComboList(data);
-    updateAliases();
-  } catch (error) { console.error("Error fetching detection data:", error); }
+    if (followLock.enabled && followLock.type === 'drone' && followLock.id === mac) { map.setView([droneLat, droneLng], map.getZoom()); }
+  }
+  if (validPilot) {
+    if (pilotMarkers[mac]) {
+      moveLayer(pilotMarkers[mac], pilotLat, pilotLng);
+    } else {
+      pilotMarkers[mac] = L.marker([pilotLat, pilotLng], {
+        icon: createIcon('👤', color),
+        pane: 'pilotIconPane'
+      })
+                            .bindPopup(detectionPopupContent)
+                            .addTo(map)
+                            .on('click', function(){ map.setView(this.getLatLng(), map.getZoom()); });
+    }
+    setPopupDetection(pilotMarkers[mac], det, 'pilot');
+    if (pilotCircles[mac]) { moveLayer(pilotCircles[mac], pilotLat, pilotLng); }
+    else {
+      pilotCircles[mac] = L.circleMarker([pilotLat, pilotLng], {
+        pane: 'pilotCirclePane',
+        renderer: pilotCircleRenderer,
+        radius: zoomSizes().pilotRadius,
+        color: color,
+        fillColor: color,
+        fillOpacity: 0.7
+      }).addTo(map);
+    }
+    extendPath(pilotPathCoords, pilotPolylines, mac, pilotLat, pilotLng, {color: color, dashArray: '5,5'});
+    if (followLock.enabled && followLock.type === 'pilot' && followLock.id === mac) { map.setView([pilotLat, pilotLng], map.getZoom()); }
+  }
 }
 
+// divIcons are shareable between markers, so one instance per
+// emoji/color/size is built and reused. The Map doubles as an LRU (hits move
+// to the end) so dragging the colour slider cannot grow it without bound.
+const ICON_CACHE_MAX = 256;
+const iconCache = new Map();
 function createIcon(emoji, color) {
   // Compute a dynamic size based on zoom
   const size = getDynamicSize();
   const actualSize = emoji === '👤' ? Math.round(size * 0.7) : Math.round(size);
   const isize = actualSize;
+  const key = emoji + '|' + color + '|' + isize;
+  let icon = iconCache.get(key);
+  if (icon) {
+    iconCache.delete(key);
+    iconCache.set(key, icon);
+    return icon;
+  }
   const half = Math.round(actualSize / 2);
-  return L.divIcon({
+  icon = L.divIcon({
     html: `<div style="width:${isize}px; height:${isize}px; font-size:${isize}px; color:${color}; text-align:center; line-height:${isize}px;">${emoji}</div>`,
     className: '',
     iconSize: [isize, isize],
     iconAnchor: [half, half]
   });
+  iconCache.set(key, icon);
+  if (iconCache.size > ICON_CACHE_MAX) { iconCache.delete(iconCache.keys().next().value); }
+  return icon;
 }
 
 function getDynamicSize() {
-  const zoomLevel = map.getZoom();
-  // Clamp between 12px and 24px, then boost by 15%
-  const base = Math.max(12, Math.min(zoomLevel * 1.5, 24));
-  return base * 1.15;
+  return zoomSizes().dynamic;
 }
 
 // Updated function: now updates all selected USB port statuses.
+let serialStatusController = null;
 async function updateSerialStatus() {
+  if (document.visibilityState !== 'visible') return;
+  if (serialStatusController) serialStatusController.abort();
+  const controller = new AbortController();
+  serialStatusController = controller;
   try {
-    const response = await fetch('/api/serial_status');
+    const response = await fetch('/api/serial_status', {signal: controller.signal});
     const data = await response.json();
     const statusDiv = document.getElementById('serialStatus');
     statusDiv.innerHTML = "";
@@ -1947,9 +2725,13 @@ async function updateSerialStatus() {
         statusDiv.appendChild(div);
       }
     }
-  } catch (error) { console.error("Error fetching serial status:", error); }
+  } catch (error) {
+    if (error.name !== 'AbortError') { console.error("Error fetching serial status:", error); }
+  } finally {
+    if (serialStatusController === controller) serialStatusController = null;
+  }
 }
-setInterval(updateSerialStatus, 1000);
+scheduleTask(updateSerialStatus, 1000);
 updateSerialStatus();
 
 // (Node Mode mainSwitch and polling interval are now managed solely by the DOMContentLoaded handler above.)
@@ -1962,93 +2744,174 @@ function updateLockFollow() {
     else if (followLock.type === 'pilot' && pilotMarkers[followLock.id]) { map.setView(pilotMarkers[followLock.id].getLatLng(), map.getZoom()); }
   }
 }
-setInterval(updateLockFollow, 200);
+scheduleTask(updateLockFollow, 200);
 
+// The Node Mode switch is the only writer of the nodeMode setting, so
+// collapsing/expanding the filter box needs no storage round-trip.
+const filterBox = document.getElementById("filterBox");
 document.getElementById("filterToggle").addEventListener("click", function() {
-  const box = document.getElementById("filterBox");
-  const isCollapsed = box.classList.toggle("collapsed");
+  const isCollapsed = filterBox.classList.toggle("collapsed");
   this.textContent = isCollapsed ? "[+]" : "[-]";
-  // Sync Node Mode toggle with stored setting when filter opens
-  const mainSwitch = document.getElementById('nodeModeMainSwitch');
-  mainSwitch.checked = (localStorage.getItem('nodeMode') === 'true');
 });
 
+let pathsReqId = 0, pathsLastApplied = 0;
+let pathsController = null;
 async function restorePaths() {
+  // An explicit refresh supersedes any request still in flight
+  if (pathsController) pathsController.abort();
+  const controller = new AbortController();
+  pathsController = controller;
   try {
-    const response = await fetch('/api/paths');
+    const reqId = ++pathsReqId;
+    const response = await fetch('/api/paths', {signal: controller.signal});
     const data = await response.json();
+    if (reqId <= pathsLastApplied) return;
+    pathsLastApplied = reqId;
     for (const mac in data.dronePaths) {
       let isActive = false;
       if (tracked_pairs[mac] && ((Date.now()/1000) - tracked_pairs[mac].last_update) <= STALE_THRESHOLD) { isActive = true; }
       if (!isActive && !historicalDrones[mac]) continue;
-      dronePathCoords[mac] = data.dronePaths[mac];
-      if (dronePolylines[mac]) { map.removeLayer(dronePolylines[mac]); }
-      const color = get_color_for_mac(mac);
-      dronePolylines[mac] = L.polyline(dronePathCoords[mac], {color: color}).addTo(map);
+      replacePath(dronePathCoords, dronePolylines, mac, data.dronePaths[mac], {color: get_color_for_mac(mac)});
     }
     for (const mac in data.pilotPaths) {
       let isActive = false;
       if (tracked_pairs[mac] && ((Date.now()/1000) - tracked_pairs[mac].last_update) <= STALE_THRESHOLD) { isActive = true; }
       if (!isActive && !historicalDrones[mac]) continue;
-      pilotPathCoords[mac] = data.pilotPaths[mac];
-      if (pilotPolylines[mac]) { map.removeLayer(pilotPolylines[mac]); }
-      const color = get_color_for_mac(mac);
-      pilotPolylines[mac] = L.polyline(pilotPathCoords[mac], {color: color, dashArray: '5,5'}).addTo(map);
+      replacePath(pilotPathCoords, pilotPolylines, mac, data.pilotPaths[mac], {color: get_color_for_mac(mac), dashArray: '5,5'});
     }
-  } catch (error) { console.error("Error restoring paths:", error); }
+  } catch (error) {
+    if (error.name !== 'AbortError') { console.error("Error restoring paths:", error); }
+  } finally {
+    if (pathsController === controller) pathsController = null;
+  }
+}
+// Path updates are pushed over /api/paths/stream as per-mac deltas; a full
+// /api/paths load only happens when the stream (re)connects or the server
+// asks for a resync. Without a working stream, poll every 10 s instead.
+let pathsFallbackTask = null;
+function startPathsFallback() {
+  if (pathsFallbackTask) return;
+  // Periodic refreshes wait for the previous one instead of aborting it
+  pathsFallbackTask = scheduleTask(() => { if (!pathsController) restorePaths(); }, 10000);
+}
+function handlePathDelta(event) {
+  const delta = JSON.parse(event.data);
+  if (delta.resync) { restorePaths(); return; }
+  const mac = delta.mac;
+  scheduleWrite(() => {
+    const color = get_color_for_mac(mac);
+    if (delta.drone) { extendPath(dronePathCoords, dronePolylines, mac, delta.drone[0], delta.drone[1], {color: color}); }
+    if (delta.pilot) { extendPath(pilotPathCoords, pilotPolylines, mac, delta.pilot[0], delta.pilot[1], {color: color, dashArray: '5,5'}); }
+  });
+}
+let pathStream = null;
+function openPathStream() {
+  pathStream = new EventSource('/api/paths/stream');
+  pathStream.onmessage = handlePathDelta;
+  pathStream.onopen = () => {
+    if (pathsFallbackTask) { cancelTask(pathsFallbackTask); pathsFallbackTask = null; }
+    restorePaths();
+  };
+  // EventSource reconnects by itself; poll until it does
+  pathStream.onerror = startPathsFallback;
+}
+if (window.EventSource) {
+  openPathStream();
+  // Hidden tabs would only pile deltas up in the write queue: drop the stream
+  // and let the reconnect's full /api/paths load resync when shown again.
+  document.addEventListener('visibilitychange', () => {
+    if (document.hidden) {
+      if (pathStream) { pathStream.close(); pathStream = null; }
+    } else if (!pathStream) {
+      openPathStream();
+    }
+  });
+} else {
+  restorePaths();
+  startPathsFallback();
+}
+
+// Timestamp throttle: runs fn at most once per ms, always delivering the last call
+function throttle(fn, ms) {
+  let last = 0, timer = null, pendingArgs = null;
+  return function(...args) {
+    const wait = ms - (Date.now() - last);
+    if (wait <= 0) { last = Date.now(); fn(...args); return; }
+    pendingArgs = args;
+    if (!timer) {
+      timer = setTimeout(() => { timer = null; last = Date.now(); fn(...pendingArgs); }, wait);
+    }
+  };
+}
+
+// Run fn once calls have stopped for ms, with the latest arguments
+function debounce(fn, ms) {
+  let timer = null;
+  return function(...args) {
+    clearTimeout(timer);
+    timer = setTimeout(() => { timer = null; fn(...args); }, ms);
+  };
+}
+
+// Run fn at most once per animation frame, with the latest arguments
+function rafThrottle(fn) {
+  let frame = 0, lastArgs = null;
+  return function(...args) {
+    lastArgs = args;
+    if (!frame) { frame = requestAnimationFrame(() => { frame = 0; fn(...lastArgs); }); }
+  };
 }
-setInterval(restorePaths, 200);
-restorePaths();
+
+// Live recolor while the slider is dragged; updateColor commits on change.
+// The preview only redraws when the hue crosses into another 5 degree bucket.
+const previewHueBucket = {};
+const previewColor = throttle(function(mac, hue) {
+  hue = parseInt(hue);
+  const bucket = Math.round(hue / 5) * 5;
+  if (previewHueBucket[mac] === bucket) return;
+  previewHueBucket[mac] = bucket;
+  recolorMac(mac, "hsl(" + hue + ", 70%, 50%)");
+}, 100);
 
 function updateColor(mac, hue) {
   hue = parseInt(hue);
+  delete previewHueBucket[mac];
   colorOverrides[mac] = hue;
-  localStorage.setItem('colorOverrides', JSON.stringify(colorOverrides));
+  persist('colorOverrides', () => colorOverrides);
   var newColor = "hsl(" + hue + ", 70%, 50%)";
-  if (droneMarkers[mac]) { droneMarkers[mac].setIcon(createIcon('🛸', newColor)); droneMarkers[mac].setPopupContent(generatePopupContent(tracked_pairs[mac], 'drone')); }
-  if (pilotMarkers[mac]) { pilotMarkers[mac].setIcon(createIcon('👤', newColor)); pilotMarkers[mac].setPopupContent(generatePopupContent(tracked_pairs[mac], 'pilot')); }
+  // Popups read the colour when they are next opened; an open one keeps
+  // showing the slider the user just moved.
+  recolorMac(mac, newColor);
+}
+
+// Recolors are queued per mac and applied together in the next animation
+// frame; a mac recoloured twice before then only gets the latest colour.
+const pendingRecolors = new Map();
+let recolorFrame = 0;
+function recolorMac(mac, newColor) {
+  pendingRecolors.set(mac, newColor);
+  if (!recolorFrame) { recolorFrame = requestAnimationFrame(flushRecolors); }
+}
+function flushRecolors() {
+  recolorFrame = 0;
+  pendingRecolors.forEach((color, mac) => applyRecolor(mac, color));
+  pendingRecolors.clear();
+}
+
+// Colour last applied to each mac's layers, so an unchanged colour is skipped
+const lastColor = new Map();
+function applyRecolor(mac, newColor) {
+  if (lastColor.get(mac) === newColor) return;
+  lastColor.set(mac, newColor);
+  if (droneMarkers[mac]) { droneMarkers[mac].setIcon(createIcon('🛸', newColor)); }
+  if (pilotMarkers[mac]) { pilotMarkers[mac].setIcon(createIcon('👤', newColor)); }
   if (droneCircles[mac]) { droneCircles[mac].setStyle({ color: newColor, fillColor: newColor }); }
   if (pilotCircles[mac]) { pilotCircles[mac].setStyle({ color: newColor, fillColor: newColor }); }
   if (dronePolylines[mac]) { dronePolylines[mac].setStyle({ color: newColor }); }
   if (pilotPolylines[mac]) { pilotPolylines[mac].setStyle({ color: newColor }); }
-  var listItems = document.getElementsByClassName("drone-item");
-  for (var i = 0; i < listItems.length; i++) {
-    if (listItems[i].textContent.includes(mac)) { listItems[i].style.borderColor = newColor; listItems[i].style.color = newColor; }
-  }
+  var item = comboListItems[mac];
+  if (item) { item.style.borderColor = newColor; item.style.color = newColor; }
 }
-</script>
-<script>
-  // Download buttons click handlers with purple flash
-  document.getElementById('downloadCsv').addEventListener('click', function() {
-    this.style.backgroundColor = 'purple';
-    setTimeout(() => { this.style.backgroundColor = '#333'; }, 300);
-    window.location.href = '/download/csv';
-  });
-  document.getElementById('downloadKml').addEventListener('click', function() {
-    this.style.backgroundColor = 'purple';
-    setTimeout(() => { this.style.backgroundColor = '#333'; }, 300);
-    window.location.href = '/download/kml';
-  });
-  document.getElementById('downloadAliases').addEventListener('click', function() {
-    this.style.backgroundColor = 'purple';
-    setTimeout(() => { this.style.backgroundColor = '#333'; }, 300);
-    window.location.href = '/download/aliases';
-  });
-  if ('serviceWorker' in navigator) {
-    navigator.serviceWorker.register('/sw.js')
-      .then(reg => console.log('Service Worker registered', reg))
-      .catch(err => console.error('Service Worker registration failed', err));
-  }
-</script>
-</body>
-</html>
-<script>
-  if ('serviceWorker' in navigator) {
-    navigator.serviceWorker.register('/sw.js')
-      .then(reg => console.log('Service Worker registered', reg))
-      .catch(err => console.error('Service Worker registration failed', err));
-  }
-</script>
 '''
 # ----------------------
 # New route: USB port selection for multiple ports.
@@ -2056,24 +2919,81 @@ function updateColor(mac, hue) {
 @app.route('/sw.js')
 def service_worker():
     sw_code = '''
+// Hosts of every basemap offered in the layer selector.
+var TILE_HOSTS = ['tile.openstreetmap.org', 'tile.openstreetmap.fr', 'basemaps.cartocdn.com', 'server.arcgisonline.com', 'tile.opentopomap.org'];
+// Bumped from 'tile-cache' (which grew without limit); activate drops the rest.
+var TILE_CACHE = 'tile-cache-v2';
+var TILE_CACHE_MAX = 500;
+var TRIM_EVERY = 25;
+var putsSinceTrim = 0;
+function isTileUrl(url) {
+  return TILE_HOSTS.some(function(host) { return url.includes(host); });
+}
 self.addEventListener('install', function(event) {
+  // Start caching on the first visit instead of after the next reload.
+  event.waitUntil(self.skipWaiting());
+});
+self.addEventListener('activate', function(event) {
   event.waitUntil(
-    caches.open('tile-cache').then(function(cache) {
-      return cache.addAll([]);
+    caches.keys().then(function(names) {
+      return Promise.all(names.filter(function(name) { return name !== TILE_CACHE; })
+                              .map(function(name) { return caches.delete(name); }));
+    }).then(function() {
+      return self.clients.claim();
     })
   );
 });
+// keys() is in insertion order and every hit is re-put by the revalidation,
+// so dropping from the front evicts the least recently used tiles.
+function trimTileCache(cache) {
+  if (++putsSinceTrim < TRIM_EVERY) return Promise.resolve();
+  putsSinceTrim = 0;
+  return cache.keys().then(function(keys) {
+    return Promise.all(keys.slice(0, Math.max(0, keys.length - TILE_CACHE_MAX))
+                           .map(function(key) { return cache.delete(key); }));
+  });
+}
+// The page posts the low-zoom tiles around its view; fetch the ones not cached yet.
+self.addEventListener('message', function(event) {
+  var data = event.data;
+  if (!data || data.type !== 'prefetch' || !Array.isArray(data.urls)) return;
+  event.waitUntil(caches.open(TILE_CACHE).then(function(cache) {
+    return Promise.all(data.urls.filter(isTileUrl).map(function(url) {
+      return cache.match(url).then(function(cached) {
+        if (cached) return;
+        // no-cors, like the map's own <img> tile requests
+        return fetch(url, { mode: 'no-cors' }).then(function(response) {
+          if (response.ok || response.type === 'opaque') {
+            return cache.put(url, response).then(function() { return trimTileCache(cache); });
+          }
+        }).catch(function() {});
+      });
+    }));
+  }));
+});
 self.addEventListener('fetch', function(event) {
   var url = event.request.url;
   // Only cache tile requests
-  if (url.includes('tile.openstreetmap.org') || url.includes('basemaps.cartocdn.com') || url.includes('server.arcgisonline.com') || url.includes('tile.opentopomap.org')) {
+  if (isTileUrl(url)) {
+    // Stale-while-revalidate: answer from the cache when possible and
+    // refresh the entry from the network in the background.
     event.respondWith(
-      caches.open('tile-cache').then(function(cache) {
-        return cache.match(event.request).then(function(response) {
-          return response || fetch(event.request).then(function(networkResponse) {
-            cache.put(event.request, networkResponse.clone());
+      caches.open(TILE_CACHE).then(function(cache) {
+        return cache.match(event.request).then(function(cached) {
+          var network = fetch(event.request).then(function(networkResponse) {
+            // Don't pin error pages; opaque (no-cors) tiles report status 0.
+            if (networkResponse.ok || networkResponse.type === 'opaque') {
+              event.waitUntil(cache.put(event.request, networkResponse.clone()).then(function() {
+                return trimTileCache(cache);
+              }));
+            }
             return networkResponse;
           });
+          if (cached) {
+            event.waitUntil(network.catch(function() {}));
+            return cached;
+          }
+          return network;
         });
       })
     );
@@ -2085,13 +3005,44 @@ self.addEventListener('fetch', function(event) {
     return response
 
 
+# Enumerating serial ports walks /sys and can take hundreds of milliseconds;
+# share one result between requests for a couple of seconds.
+PORTS_CACHE_TTL = 2.0
+ports_cache = {'time': None, 'ports': []}
+ports_cache_lock = threading.Lock()
+
+def list_ports_cached(max_age=PORTS_CACHE_TTL):
+    """Return comports(), enumerating again only if the cached list is older than max_age."""
+    with ports_cache_lock:
+        now = time.monotonic()
+        if ports_cache['time'] is None or now - ports_cache['time'] >= max_age:
+            ports_cache['ports'] = list(serial.tools.list_ports.comports())
+            ports_cache['time'] = now
+        return ports_cache['ports']
+
+port_page_cache = {'key': None, 'page': None}
+port_page_lock = threading.Lock()
+
 # ----------------------
 # New route: USB port selection for multiple ports.
 # ----------------------
 @app.route('/select_ports', methods=['GET'])
 def select_ports_get():
-    ports = list(serial.tools.list_ports.comports())
-    return render_template_string(PORT_SELECTION_PAGE, ports=ports, logo_ascii=LOGO_ASCII, bottom_ascii=BOTTOM_ASCII)
+    ports = list_ports_cached()
+    # The page only depends on the port list; render it again only when that changes.
+    key = tuple((p.device, p.description) for p in ports)
+    with port_page_lock:
+        if port_page_cache['key'] != key:
+            # The three dropdowns share one option list; build it once instead of looping in Jinja per select.
+            options_html = Markup('<option value="">--None--</option>' + ''.join(
+                f'<option value="{escape(device)}">{escape(device)} - {escape(description)}</option>'
+                for device, description in key
+            ))
+            html = PORT_SELECTION_TEMPLATE.render(options_html=options_html, logo_ascii=LOGO_ASCII, bottom_ascii=BOTTOM_ASCII)
+            port_page_cache['page'] = cached_page(html)
+            port_page_cache['key'] = key
+        page = port_page_cache['page']
+    return page_response(page)
 
 @app.route('/select_ports', methods=['POST'])
 def select_ports_post():
@@ -2106,8 +3057,9 @@ def select_ports_post():
         SELECTED_PORTS['port2'] = port2
     if port3:
         SELECTED_PORTS['port3'] = port3
-    # Start threads for each selected port.
-    for key, port in SELECTED_PORTS.items():
+    # Start threads only for selected ports that don't already have a reader.
+    running = {port for port, thread in serial_threads.items() if thread.is_alive()}
+    for port in set(SELECTED_PORTS.values()) - running:
         serial_connected_status[port] = False  # initialize status
         start_serial_thread(port)
     return redirect(url_for('index'))
@@ -2152,15 +3104,82 @@ ________                                  _____
         \/                  \/     \/          \/     \/|__|   |__|        \/       
 """
 
+# ----------------------
+# HTML page caching: strong ETag + gzip
+# ----------------------
+def cached_page(text, mimetype='text/html'):
+    body = text.encode('utf-8')
+    return {
+        'body': body,
+        'mimetype': mimetype,
+        'etag': hashlib.blake2b(body, digest_size=8).hexdigest(),
+        'gzip': None,
+        'br': None,
+    }
+
+def page_response(page, immutable=False):
+    # Each encoding is a different byte stream, so each gets its own strong ETag.
+    # accept_encodings parses q-values, so 'br;q=0' counts as a refusal.
+    if brotli is not None and request.accept_encodings['br'] > 0:
+        encoding, etag = 'br', page['etag'] + '-br'
+    elif request.accept_encodings['gzip'] > 0:
+        encoding, etag = 'gzip', page['etag'] + '-gz'
+    else:
+        encoding, etag = None, page['etag']
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif encoding == 'br':
+        if page['br'] is None:
+            page['br'] = brotli.compress(page['body'], quality=5)
+        response = Response(page['br'], mimetype=page['mimetype'])
+        response.headers['Content-Encoding'] = 'br'
+    elif encoding == 'gzip':
+        if page['gzip'] is None:
+            page['gzip'] = gzip.compress(page['body'])
+        response = Response(page['gzip'], mimetype=page['mimetype'])
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(page['body'], mimetype=page['mimetype'])
+    response.set_etag(etag)
+    if immutable:
+        # Content-hashed URL: the bytes behind it never change.
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        # Browsers revalidate each load and get a 304 while the page is unchanged.
+        response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+MESH_MAPPER_CSS_CACHE = cached_page(MESH_MAPPER_CSS, 'text/css')
+MESH_MAPPER_JS_CACHE = cached_page(MESH_MAPPER_JS, 'application/javascript')
+# The page links the stylesheet and script by content hash, so they can be
+# cached forever and a new build is picked up through the (revalidated) HTML.
+HTML_PAGE_CACHE = cached_page(
+    HTML_PAGE
+    .replace('/mesh-mapper.css', f"/mesh-mapper.{MESH_MAPPER_CSS_CACHE['etag']}.css")
+    .replace('/mesh-mapper.js', f"/mesh-mapper.{MESH_MAPPER_JS_CACHE['etag']}.js")
+)
+
 @app.route('/')
 def index():
     if (len(SELECTED_PORTS) == 0):
         return redirect(url_for('select_ports_get'))
-    return HTML_PAGE
+    return page_response(HTML_PAGE_CACHE)
+
+@app.route('/mesh-mapper.<version>.css')
+def mesh_mapper_css(version):
+    # A stale hash (page from an older build) gets today's file, uncached.
+    return page_response(MESH_MAPPER_CSS_CACHE, immutable=(version == MESH_MAPPER_CSS_CACHE['etag']))
+
+@app.route('/mesh-mapper.<version>.js')
+def mesh_mapper_js(version):
+    return page_response(MESH_MAPPER_JS_CACHE, immutable=(version == MESH_MAPPER_JS_CACHE['etag']))
 
 @app.route('/api/detections', methods=['GET'])
 def api_detections():
-    return jsonify(tracked_pairs)
+    # Serialize under the lock: entries can gain keys while a detection is merged.
+    with tracked_pairs_lock:
+        return jsonify(tracked_pairs)
 
 @app.route('/api/detections', methods=['POST'])
 def post_detection():
@@ -2170,8 +3189,11 @@ def post_detection():
 
 @app.route('/api/detections_history', methods=['GET'])
 def api_detections_history():
+    # Snapshot under the lock: serial threads append while we iterate
+    with tracked_pairs_lock:
+        history = list(detection_history)
     features = []
-    for det in detection_history:
+    for det in history:
         if det.get("drone_lat", 0) == 0 and det.get("drone_long", 0) == 0:
             continue
         features.append({
@@ -2194,12 +3216,12 @@ def api_detections_history():
 
 @app.route('/api/reactivate/<mac>', methods=['POST'])
 def reactivate(mac):
-    if mac in tracked_pairs:
-        tracked_pairs[mac]['last_update'] = time.time()
-        print(f"Reactivated {mac}")
-        return jsonify({"status": "reactivated", "mac": mac})
-    else:
-        return jsonify({"status": "error", "message": "MAC not found"}), 404
+    with tracked_pairs_lock:
+        if mac in tracked_pairs:
+            tracked_pairs[mac]['last_update'] = time.time()
+            print(f"Reactivated {mac}")
+            return jsonify({"status": "reactivated", "mac": mac})
+    return jsonify({"status": "error", "message": "MAC not found"}), 404
 
 @app.route('/api/aliases', methods=['GET'])
 def api_aliases():
@@ -2227,43 +3249,171 @@ def api_clear_alias(mac):
 # Updated status endpoint: returns a dict of statuses for each selected USB.
 @app.route('/api/ports', methods=['GET'])
 def api_ports():
-    ports = list(serial.tools.list_ports.comports())
+    ports = list_ports_cached()
     return jsonify({
         'ports': [{'device': p.device, 'description': p.description} for p in ports]
     })
 
+class PortWatcher:
+    """Enumerates serial ports in one background thread and pushes changes to SSE subscribers."""
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.thread = None
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=16)
+        with self.lock:
+            self.subscribers.add(q)
+            if self.snapshot is not None:
+                q.put_nowait(self.snapshot)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers.discard(q)
+
+    def run(self):
+        while True:
+            with self.lock:
+                subscribers = list(self.subscribers)
+            # Nobody is on the selection page: skip the enumeration entirely.
+            if subscribers:
+                # Always enumerate fresh so hotplugs show up; this refreshes the shared cache too
+                ports = list_ports_cached(max_age=0)
+                payload = json.dumps({
+                    'ports': [{'device': p.device, 'description': p.description} for p in ports]
+                })
+                if payload != self.snapshot:
+                    self.snapshot = payload
+                    for q in subscribers:
+                        try:
+                            q.put_nowait(payload)
+                        except queue.Full:
+                            pass
+            time.sleep(self.interval)
+
+port_watcher = PortWatcher()
+PORTS_KEEPALIVE_INTERVAL = 30  # seconds between SSE heartbeats
+
+@app.route('/api/ports/stream', methods=['GET'])
+def api_ports_stream():
+    q = port_watcher.subscribe()
+    def stream():
+        try:
+            while True:
+                try:
+                    yield f"data: {q.get(timeout=PORTS_KEEPALIVE_INTERVAL)}\n\n"
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            port_watcher.unsubscribe(q)
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 # Updated status endpoint: returns a dict of statuses for each selected USB.
 @app.route('/api/serial_status', methods=['GET'])
 def api_serial_status():
     return jsonify({"statuses": serial_connected_status})
 
+def publish_path_delta(detection):
+    """Push the new drone/pilot position of a detection to /api/paths/stream clients."""
+    with path_subscribers_lock:
+        if not path_subscribers:
+            return
+        subscribers = list(path_subscribers)
+    d_lat, d_long = detection.get("drone_lat", 0), detection.get("drone_long", 0)
+    p_lat, p_long = detection.get("pilot_lat", 0), detection.get("pilot_long", 0)
+    delta = {"mac": detection.get("mac")}
+    if d_lat != 0 and d_long != 0:
+        delta["drone"] = [d_lat, d_long]
+    if p_lat != 0 and p_long != 0:
+        delta["pilot"] = [p_lat, p_long]
+    if len(delta) == 1:
+        return
+    payload = json.dumps(delta)
+    for q in subscribers:
+        try:
+            q.put_nowait(payload)
+        except queue.Full:
+            # Client fell behind: drop its backlog and have it reload full paths
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                q.put_nowait(PATHS_RESYNC)
+            except queue.Full:
+                pass
+
+PATHS_RESYNC = json.dumps({"resync": True})
+PATHS_KEEPALIVE_INTERVAL = 30  # seconds between SSE heartbeats
+
+@app.route('/api/paths/stream', methods=['GET'])
+def api_paths_stream():
+    q = queue.Queue(maxsize=256)
+    with path_subscribers_lock:
+        path_subscribers.add(q)
+    def stream():
+        try:
+            while True:
+                try:
+                    yield f"data: {q.get(timeout=PATHS_KEEPALIVE_INTERVAL)}\n\n"
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            with path_subscribers_lock:
+                path_subscribers.discard(q)
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/paths', methods=['GET'])
 def api_paths():
-    drone_paths = {}
-    pilot_paths = {}
-    for det in detection_history:
+    global paths_dirty, paths_page
+    with paths_cache_lock:
+        # Snapshot under the lock: serial threads append while we iterate
+        with tracked_pairs_lock:
+            rebuild = paths_dirty or paths_page is None
+            if rebuild:
+                history = list(detection_history)
+                paths_dirty = False
+        if rebuild:
+            paths_page = cached_page(dumps_json(build_paths(history)), 'application/json')
+        page = paths_page
+    # Unchanged paths answer a revalidating client with 304
+    return page_response(page)
+
+def build_paths(history):
+    """Per-mac drone and pilot paths from the detection history, without repeated points."""
+    drone_paths = defaultdict(list)
+    pilot_paths = defaultdict(list)
+    # Last point added per mac, so repeated positions are skipped in the same pass
+    last_drone = {}
+    last_pilot = {}
+    for det in history:
         mac = det.get("mac")
         if not mac:
             continue
         d_lat = det.get("drone_lat", 0)
         d_long = det.get("drone_long", 0)
         if d_lat != 0 and d_long != 0:
-            drone_paths.setdefault(mac, []).append([d_lat, d_long])
+            point = (d_lat, d_long)
+            if last_drone.get(mac) != point:
+                drone_paths[mac].append([d_lat, d_long])
+                last_drone[mac] = point
         p_lat = det.get("pilot_lat", 0)
         p_long = det.get("pilot_long", 0)
         if p_lat != 0 and p_long != 0:
-            pilot_paths.setdefault(mac, []).append([p_lat, p_long])
-    def dedupe(path):
-        if not path:
-            return path
-        new_path = [path[0]]
-        for point in path[1:]:
-            if point != new_path[-1]:
-                new_path.append(point)
-        return new_path
-    for mac in drone_paths: drone_paths[mac] = dedupe(drone_paths[mac])
-    for mac in pilot_paths: pilot_paths[mac] = dedupe(pilot_paths[mac])
-    return jsonify({"dronePaths": drone_paths, "pilotPaths": pilot_paths})
+            point = (p_lat, p_long)
+            if last_pilot.get(mac) != point:
+                pilot_paths[mac].append([p_lat, p_long])
+                last_pilot[mac] = point
+    return {"dronePaths": drone_paths, "pilotPaths": pilot_paths}
 
 # ----------------------
 # Serial Reader Threads: Each selected port gets its own thread.
@@ -2286,32 +3436,30 @@ def serial_reader(port):
                 continue
 
         try:
-            # Read incoming data
-            if ser.in_waiting:
-                line = ser.readline().decode('utf-8', errors='ignore').strip()
-                if not line:
-                    continue
-                # JSON extraction and detection handling...
-                if '{' in line:
-                    json_str = line[line.find('{'):]
-                else:
-                    json_str = line
-                try:
-                    detection = json.loads(json_str)
-                    # MAC tracking logic...
-                    if 'mac' in detection:
-                        last_mac_by_port[port] = detection['mac']
-                    elif port in last_mac_by_port:
-                        detection['mac'] = last_mac_by_port[port]
-                except json.JSONDecodeError:
-                    continue
-                if 'remote_id' in detection and 'basic_id' not in detection:
-                    detection['basic_id'] = detection['remote_id']
-                if 'heartbeat' in detection:
-                    continue
-                update_detection(detection)
+            # Block in readline until a line arrives (or the 1 s port timeout
+            # passes) instead of polling in_waiting and sleeping between checks.
+            line = ser.readline().decode('utf-8', errors='ignore').strip()
+            if not line:
+                continue
+            # JSON extraction and detection handling...
+            if '{' in line:
+                json_str = line[line.find('{'):]
             else:
-                time.sleep(0.1)
+                json_str = line
+            try:
+                detection = json.loads(json_str)
+                # MAC tracking logic...
+                if 'mac' in detection:
+                    last_mac_by_port[port] = detection['mac']
+                elif port in last_mac_by_port:
+                    detection['mac'] = last_mac_by_port[port]
+            except json.JSONDecodeError:
+                continue
+            if 'remote_id' in detection and 'basic_id' not in detection:
+                detection['basic_id'] = detection['remote_id']
+            if 'heartbeat' in detection:
+                continue
+            update_detection(detection)
         except (serial.SerialException, OSError) as e:
             serial_connected_status[port] = False
             print(f"SerialException/OSError on {port}: {e}")
@@ -2338,7 +3486,11 @@ def serial_reader(port):
             time.sleep(1)
 
 def start_serial_thread(port):
+    thread = serial_threads.get(port)
+    if thread is not None and thread.is_alive():
+        return
     thread = threading.Thread(target=serial_reader, args=(port,), daemon=True)
+    serial_threads[port] = thread
     thread.start()
 
 # Download endpoints for CSV, KML, and Aliases files
@@ -2348,8 +3500,13 @@ def download_csv():
 
 @app.route('/download/kml')
 def download_kml():
-    # regenerate KML to include latest detections
-    generate_kml()
+    global kml_dirty
+    # kml_writer rewrites the file within KML_WRITE_INTERVAL of any change;
+    # only regenerate here if an update is still pending.
+    if kml_dirty:
+        kml_dirty = False
+        generate_kml()
+    # send_file is conditional by default: an unchanged KML revalidates to a 304
     return send_file(KML_FILENAME, as_attachment=True)
 
 @app.route('/download/aliases')